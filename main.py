@@ -18,6 +18,7 @@ from src.api.endpoints import (
     participant_snapshots
 )
 from src.services.scheduler_service import start_scheduler, shutdown_scheduler
+from src.utils.token import describe_hmac_backend
 from fastapi.middleware.gzip import GZipMiddleware
 
 # Configure logging
@@ -33,6 +34,7 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("[OK] Starting KU RUN Check-in API...")
+    logger.info(f"[OK] JWT HMAC backend: {describe_hmac_backend()}")
     await init_db()
     logger.info("[OK] Database initialized")
     
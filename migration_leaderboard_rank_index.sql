@@ -0,0 +1,7 @@
+-- Migration to add a composite index for Leaderboard reads
+-- Created: 2026-10-17
+-- Purpose: get_leaderboard_entries filters by config_id and orders by rank;
+--          (config_id, rank) serves both from one index instead of two single-column ones.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_lb_entries_config_rank
+    ON reward_leaderboard_entries (config_id, rank);
@@ -0,0 +1,32 @@
+-- Migration to add Unique Constraint for monthly User Rewards
+-- Created: 2026-10-17
+-- Purpose: Remove duplicate user_rewards for the same user/reward/month (keep the earliest one),
+--          and add the Unique Constraint used by check_and_award_rewards (ON CONFLICT DO NOTHING).
+
+-- 1. Check for duplicates (Optional - for verification)
+-- SELECT user_id, reward_id, earned_year, earned_month, count(*)
+-- FROM user_rewards
+-- GROUP BY user_id, reward_id, earned_year, earned_month
+-- HAVING count(*) > 1;
+
+BEGIN;
+
+-- 2. Remove duplicates
+-- Logic: Keep the record with the LOWEST ID (first awarded)
+DELETE FROM user_rewards a USING (
+    SELECT min(id) as id, user_id, reward_id, earned_year, earned_month
+    FROM user_rewards
+    GROUP BY user_id, reward_id, earned_year, earned_month
+    HAVING count(*) > 1
+) b
+WHERE a.user_id = b.user_id
+  AND a.reward_id = b.reward_id
+  AND a.earned_year = b.earned_year
+  AND a.earned_month = b.earned_month
+  AND a.id <> b.id;
+
+-- 3. Add Unique Constraint
+ALTER TABLE user_rewards
+ADD CONSTRAINT uq_user_reward_monthly UNIQUE (user_id, reward_id, earned_year, earned_month);
+
+COMMIT;
@@ -33,9 +33,6 @@ async def clear_test_database():
     engine = create_async_engine(TEST_DATABASE_URL, echo=False)
     
     async with engine.begin() as conn:
-        # Disable foreign key checks
-        await conn.execute(text("SET session_replication_role = 'replica';"))
-        
         # Get all table names
         result = await conn.execute(text(
             "SELECT tablename FROM pg_tables WHERE schemaname = 'public'"
@@ -44,16 +41,12 @@ async def clear_test_database():
         
         print(f"   พบ {len(tables)} ตาราง")
         
-        # Truncate all tables
-        for table in tables:
-            try:
-                await conn.execute(text(f'TRUNCATE TABLE "{table}" CASCADE'))
-                print(f"   ✓ ล้าง {table}")
-            except Exception as e:
-                print(f"   ⚠ ข้าม {table}: {e}")
-        
-        # Re-enable foreign key checks
-        await conn.execute(text("SET session_replication_role = 'origin';"))
+        # Truncate all tables in one statement
+        # (ล้างทุกตารางพร้อมกัน ไม่ติด foreign key จึงไม่ต้องปิด FK checks และไม่ต้องวนทีละตาราง)
+        if tables:
+            table_list = ", ".join(f'"{table}"' for table in tables)
+            await conn.execute(text(f"TRUNCATE TABLE {table_list} CASCADE"))
+            print(f"   ✓ ล้าง {', '.join(tables)}")
     
     await engine.dispose()
     
@@ -34,12 +34,13 @@ async def get_current_user(
     )
 
     # Debug: Log received token
-    logger.info(f"[AUTH] Received token: {token[:30] if token else 'None'}...")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[AUTH] Received token: %.30s...", token)
 
     # Verify token
     payload = verify_access_token(token)
     if payload is None:
-        logger.warning(f"[AUTH] Token verification FAILED. Token: {token[:30] if token else 'None'}...")
+        logger.warning("[AUTH] Token verification FAILED. Token: %.30s...", token)
         raise credentials_exception
 
     user_id: str = payload.get("sub")
@@ -1,16 +1,17 @@
 import os
-import uuid
 import mimetypes
-from pathlib import Path
 from typing import Optional, List
 from fastapi import UploadFile, HTTPException, status, APIRouter, File, Depends, Form, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-import aiofiles
 
 from src.api.dependencies.auth import get_db, get_current_user, require_staff_or_organizer
 from src.models.user import User
 from src.models.uploaded_image import UploadedImage
 from src.utils.image_hash import calculate_image_hash_from_bytes
+from src.utils.image_upload import (
+    ALLOWED_EXTENSIONS, ALLOWED_SUBFOLDERS, MAX_FILE_SIZE,
+    validate_subfolder, resolve_upload_target, validate_file_path
+)
 from src.crud import image_crud
 from src.schemas.image_schema import (
     ImageResponse, ImageUploadResponse, ImageListResponse, 
@@ -20,80 +21,6 @@ from src.schemas.image_schema import (
 # สร้าง Router instance เพื่อให้ main.py เรียกใช้ได้
 router = APIRouter()
 
-# Configuration
-UPLOAD_DIR = Path("uploads")
-ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".heic", ".webp"}
-MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
-
-# Create upload directories
-(UPLOAD_DIR / "events").mkdir(parents=True, exist_ok=True)
-(UPLOAD_DIR / "proofs").mkdir(parents=True, exist_ok=True)
-(UPLOAD_DIR / "rewards").mkdir(parents=True, exist_ok=True)
-
-
-def validate_image_file(file: UploadFile) -> None:
-    """Validate uploaded image file"""
-    if not file:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="No file provided"
-        )
-
-    file_ext = Path(file.filename).suffix.lower()
-    if file_ext not in ALLOWED_EXTENSIONS:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid file type. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
-        )
-
-
-def generate_unique_filename(original_filename: str) -> str:
-    """Generate unique filename to prevent collisions"""
-    file_ext = Path(original_filename).suffix.lower()
-    unique_id = uuid.uuid4().hex
-    return f"{unique_id}{file_ext}"
-
-
-def validate_subfolder(subfolder: str) -> None:
-    """Validate subfolder to prevent directory traversal attacks"""
-    allowed_subfolders = ["events", "proofs", "rewards"]
-    if subfolder not in allowed_subfolders:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid subfolder. Allowed: {', '.join(allowed_subfolders)}"
-        )
-
-
-def validate_file_path(file_path: str) -> Path:
-    """Validate and sanitize file path to prevent directory traversal"""
-    if not file_path or not file_path.startswith("/uploads/"):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid file path"
-        )
-
-    # Remove leading slash and validate
-    relative_path = file_path.lstrip("/")
-    full_path = Path(relative_path)
-
-    # Check if path is within uploads directory
-    try:
-        resolved_path = full_path.resolve()
-        uploads_path = UPLOAD_DIR.resolve()
-
-        if not str(resolved_path).startswith(str(uploads_path)):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid file path - directory traversal detected"
-            )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid file path"
-        )
-
-    return full_path
-
 
 async def save_upload_file(
         file: UploadFile,
@@ -105,33 +32,28 @@ async def save_upload_file(
     Returns:
         tuple: (file_path, image_hash, file_size, filename)
     """
-    validate_image_file(file)
-    validate_subfolder(subfolder)
-
-    filename = generate_unique_filename(file.filename)
-    save_path = UPLOAD_DIR / subfolder
-    save_path.mkdir(parents=True, exist_ok=True)
+    save_path, filename = resolve_upload_target(file, subfolder)
     file_path = save_path / filename
 
-    total_size = 0
-    file_bytes = bytearray()  # 🆕 Collect bytes for hashing
+    # อ่านทั้งไฟล์ในครั้งเดียว (ต้องใช้ bytes ทั้งหมดคำนวณ hash อยู่แล้ว)
+    # อ่านเกิน MAX_FILE_SIZE 1 byte เพื่อรู้ว่าไฟล์ใหญ่เกินโดยไม่ต้องเขียนลงดิสก์ก่อน
+    file_bytes = await file.read(MAX_FILE_SIZE + 1)
+    total_size = len(file_bytes)
+    if total_size > MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File too large. Maximum size: {MAX_FILE_SIZE / (1024 * 1024)}MB"
+        )
+
+    # โหลด aiofiles ตอนบันทึกไฟล์ครั้งแรก ไม่ต้องโหลดตอน import router
+    import aiofiles
 
     try:
         async with aiofiles.open(file_path, 'wb') as f:
-            while chunk := await file.read(8192):
-                total_size += len(chunk)
-                if total_size > MAX_FILE_SIZE:
-                    await f.close()
-                    file_path.unlink(missing_ok=True)
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"File too large. Maximum size: {MAX_FILE_SIZE / (1024 * 1024)}MB"
-                    )
-                await f.write(chunk)
-                file_bytes.extend(chunk)  # 🆕 Collect bytes
+            await f.write(file_bytes)
 
         # 🆕 Calculate image hash
-        image_hash = calculate_image_hash_from_bytes(bytes(file_bytes))
+        image_hash = calculate_image_hash_from_bytes(file_bytes)
 
         if not image_hash:
             # Clean up if hash calculation fails
@@ -287,7 +209,7 @@ async def get_upload_info(
     return {
         "max_file_size_mb": MAX_FILE_SIZE / (1024 * 1024),
         "allowed_extensions": list(ALLOWED_EXTENSIONS),
-        "allowed_subfolders": ["events", "proofs", "rewards"],
+        "allowed_subfolders": list(ALLOWED_SUBFOLDERS),
         "upload_permissions": {
             "events": ["organizer", "staff"],
             "proofs": ["student", "officer", "staff", "organizer"],
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.api.dependencies.auth import (
     get_db,
@@ -8,7 +8,7 @@ from src.api.dependencies.auth import (
 from src.crud import reward_crud
 from src.schemas.reward_schema import RewardCreate, RewardUpdate, RewardRead, UserRewardRead
 from src.models.user import User
-from typing import List
+from typing import Dict, List
 
 router = APIRouter()
 
@@ -27,6 +27,21 @@ async def get_rewards(
     return await reward_crud.get_rewards(db, skip, limit)
 
 
+# ต้องประกาศก่อน /{reward_id} ไม่งั้น "users" จะถูกจับเป็น reward_id
+@router.get("/users", response_model=Dict[int, List[UserRewardRead]])
+async def get_rewards_for_users(
+    ids: List[int] = Query(..., max_length=500, description="User IDs (?ids=1&ids=2)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_organizer)
+):
+    """
+    Get rewards earned by many users in one request
+    Returns: {user_id: [rewards]}
+    Requires: Organizer role
+    """
+    return await reward_crud.get_rewards_for_users(db, ids)
+
+
 @router.get("/{reward_id}", response_model=RewardRead)
 async def get_reward(
     reward_id: int,
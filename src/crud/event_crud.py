@@ -56,6 +56,21 @@ async def get_event_participant_stats(db: AsyncSession, event_id: int) -> Partic
     )
 
 
+async def count_event_participants(db: AsyncSession, event_id: int) -> int:
+    """
+    นับผู้เข้าร่วมแบบไม่ซ้ำ (ไม่รวม cancelled) ด้วย COUNT(DISTINCT user_id) ฝั่ง DB
+    ได้ค่าเดียวกับ Event.participant_count โดยไม่ต้องโหลด participations ทั้งหมด
+    """
+    result = await db.execute(
+        select(
+            func.count(EventParticipation.user_id.distinct())
+            .filter(EventParticipation.status != ParticipationStatus.CANCELLED)
+        )
+        .where(EventParticipation.event_id == event_id)
+    )
+    return result.scalar_one()
+
+
 async def get_event_participants(db: AsyncSession, event_id: int) -> List[ParticipantInfo]:
     """ดึงรายชื่อผู้เข้าร่วมทั้งหมด"""
     result = await db.execute(
@@ -290,21 +305,65 @@ async def get_event_leaderboard(db: AsyncSession, event_id: int) -> List[Leaderb
     return leaderboard
 
 
+async def get_event_counters(db: AsyncSession, event_id: int) -> Optional[Dict[str, any]]:
+    """
+    ข้อมูลความจุของงาน: จำนวนผู้เข้าร่วมแบบไม่ซ้ำ + ที่ว่าง + เต็มหรือไม่ ใน query เดียว
+    (COUNT(DISTINCT user_id) ฝั่ง DB แทนการโหลด participations มานับสามรอบผ่าน property)
+    เลือกเฉพาะคอลัมน์ ไม่โหลด Event เป็น ORM object จึงไม่ไปกระตุ้น selectin ของ relationships
+    """
+    result = await db.execute(
+        select(
+            Event.id,
+            Event.title,
+            Event.max_participants,
+            Event.is_active,
+            Event.is_published,
+            func.count(EventParticipation.user_id.distinct())
+            .filter(EventParticipation.status != ParticipationStatus.CANCELLED)
+            .label("participant_count")
+        )
+        .outerjoin(EventParticipation, EventParticipation.event_id == Event.id)
+        .where(Event.id == event_id)
+        .group_by(Event.id)
+    )
+    row = result.one_or_none()
+    if not row:
+        return None
+
+    # ความหมายเดียวกับ Event.remaining_slots / Event.is_full
+    if row.max_participants is None:
+        remaining_slots, is_full = -1, False
+    else:
+        remaining_slots = max(0, row.max_participants - row.participant_count)
+        is_full = row.participant_count >= row.max_participants
+
+    return {
+        "event_id": row.id,
+        "title": row.title,
+        "is_active": row.is_active,
+        "is_published": row.is_published,
+        "participant_count": row.participant_count,
+        "max_participants": row.max_participants,
+        "remaining_slots": remaining_slots,
+        "is_full": is_full,
+    }
+
+
 async def check_event_capacity(db: AsyncSession, event_id: int) -> Dict[str, any]:
     """ตรวจสอบความจุของงาน"""
-    event = await get_event_by_id(db, event_id)
+    counters = await get_event_counters(db, event_id)
 
-    if not event:
+    if not counters:
         return None
 
     return {
-        "event_id": event.id,
-        "title": event.title,
-        "current_participants": event.participant_count,
-        "max_participants": event.max_participants,
-        "remaining_slots": event.remaining_slots,
-        "is_full": event.is_full,
-        "can_join": not event.is_full and event.is_active and event.is_published
+        "event_id": counters["event_id"],
+        "title": counters["title"],
+        "current_participants": counters["participant_count"],
+        "max_participants": counters["max_participants"],
+        "remaining_slots": counters["remaining_slots"],
+        "is_full": counters["is_full"],
+        "can_join": not counters["is_full"] and counters["is_active"] and counters["is_published"]
     }
 
 
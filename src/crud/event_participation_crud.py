@@ -3,7 +3,7 @@
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from sqlalchemy import func, extract, case, and_
+from sqlalchemy import func, extract, case, and_, lambda_stmt
 from src.models.event_participation import EventParticipation, ParticipationStatus
 from src.models.event import Event, EventType  # Added EventType import
 from src.schemas.event_participation_schema import EventParticipationCreate
@@ -11,26 +11,73 @@ from src.crud import notification_crud
 from datetime import datetime, timezone, date, timedelta
 from typing import Optional, Dict, List
 from decimal import Decimal
-import random
+import secrets
 import string
 from fastapi import HTTPException, status
 
-from src.utils.image_hash import are_images_similar, get_hash_similarity_score
+from src.utils.image_hash import get_hash_similarity_scores
 import pytz
 
 BANGKOK_TZ = pytz.timezone('Asia/Bangkok')
 
+# Hamming distance สูงสุดที่ถือว่าเป็นรูปซ้ำ (0 = เหมือนกันทุก bit)
+DUPLICATE_IMAGE_THRESHOLD = 5
+
+# ตัวอักษรของรหัส (A-Z, 0-9) สร้างครั้งเดียวตอน import
+CODE_ALPHABET = string.ascii_uppercase + string.digits
+# byte สุ่ม 0-251 → ตัวอักษร (b % 36); 252-255 ถูกทิ้ง เพื่อให้ทุกตัวมีโอกาสเท่ากัน (252 = 7 * 36)
+_CODE_BYTE_TABLE = bytes(ord(CODE_ALPHABET[b % len(CODE_ALPHABET)]) for b in range(256))
+_CODE_BYTE_REJECT = bytes(range(252, 256))
+
+
+def _random_codes(count: int, length: int) -> List[str]:
+    """
+    สุ่มรหัส `count` ตัว ยาวตัวละ `length` จาก CODE_ALPHABET
+    ใช้ secrets (CSPRNG) ดึง byte ทีเดียวแล้วแปลงด้วย bytes.translate (ทำใน C ทั้งก้อน)
+    """
+    need = count * length
+    chars = b''
+    while len(chars) < need:
+        chars += secrets.token_bytes(need - len(chars) + 8).translate(_CODE_BYTE_TABLE, _CODE_BYTE_REJECT)
+    text = chars[:need].decode('ascii')
+    return [text[i:i + length] for i in range(0, need, length)]
+
+
 def generate_join_code() -> str:
     """Generate unique 5-character alphanumeric code (A-Z, 0-9)"""
-    # Use uppercase letters and digits
     # Pool size: 36^5 = 60,466,176 combinations (vs 10^5 = 100,000)
-    chars = string.ascii_uppercase + string.digits
-    return ''.join(random.choices(chars, k=5))
+    return _random_codes(1, 5)[0]
+
+
+def generate_join_codes(count: int) -> List[str]:
+    """Generate `count` random join codes in one batch (may repeat; not checked against the DB)"""
+    return _random_codes(count, 5)
+
+# จำนวน join code สูงสุดต่อหนึ่ง query ตอนเช็คซ้ำแบบ batch (ไม่ให้เกิน parameter limit ของ asyncpg)
+JOIN_CODE_LOOKUP_BATCH = 5000
+
+
+async def generate_unique_join_codes(db: AsyncSession, count: int) -> List[str]:
+    """Generate `count` distinct join codes that are not used yet, checking the DB in batches"""
+    codes: List[str] = []
+    seen = set()
+    while len(codes) < count:
+        candidates = list(set(generate_join_codes(count - len(codes))) - seen)
+        taken = set()
+        for start in range(0, len(candidates), JOIN_CODE_LOOKUP_BATCH):
+            result = await db.execute(
+                select(EventParticipation.join_code)
+                .where(EventParticipation.join_code.in_(candidates[start:start + JOIN_CODE_LOOKUP_BATCH]))
+            )
+            taken.update(result.scalars().all())
+        seen.update(candidates)
+        codes.extend(code for code in candidates if code not in taken)
+    return codes
 
 
 def generate_completion_code() -> str:
     """Generate unique 10-character code"""
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=10))
+    return _random_codes(1, 10)[0]
 
 
 async def get_participations_by_user(db: AsyncSession, user_id: int):
@@ -173,16 +220,15 @@ async def check_duplicate_proof_image(
     )
     participations = result.scalars().all()
 
-    # Check for similar images
-    for participation in participations:
+    # Check for similar images (Hamming distance for all stored hashes in one pass)
+    scores = get_hash_similarity_scores(image_hash, [p.proof_image_hash for p in participations])
+    for participation, similarity in zip(participations, scores):
         # Skip if it's the same participation (for resubmit)
         if current_participation_id and participation.id == current_participation_id:
             continue
 
         # Check if hashes are similar
-        if are_images_similar(image_hash, participation.proof_image_hash, threshold=5):
-            similarity = get_hash_similarity_score(image_hash, participation.proof_image_hash)
-
+        if similarity is not None and similarity <= DUPLICATE_IMAGE_THRESHOLD:
             return {
                 "is_duplicate": True,
                 "participation_id": participation.id,
@@ -1199,6 +1245,20 @@ async def ensure_daily_participation(
         # Might race with scheduler, ignore unique constraint error
         pass
 
+async def count_active_participations(db: AsyncSession, user_id: int, event_id: int) -> int:
+    """
+    นับรหัสทั้งหมดของ user ในกิจกรรม (ทุกสถานะยกเว้น CANCELLED)
+    ใช้ lambda_stmt: SQL compile ครั้งเดียวแล้ว cache ไว้ (user_id/event_id กลายเป็น bound parameter)
+    """
+    result = await db.execute(lambda_stmt(
+        lambda: select(func.count(EventParticipation.id)).where(
+            EventParticipation.user_id == user_id,
+            EventParticipation.event_id == event_id,
+            EventParticipation.status != ParticipationStatus.CANCELLED
+        )
+    ))
+    return result.scalar() or 0
+
 async def pre_register_for_multi_day_event(
         db: AsyncSession,
         user_id: int,
@@ -1263,15 +1323,7 @@ async def pre_register_for_multi_day_event(
 
     # ตรวจสอบจำนวนครั้งทั้งหมด (ถ้ามี limit)
     if event.max_checkins_per_user:
-        total_count_result = await db.execute(
-            select(func.count(EventParticipation.id))
-            .where(
-                EventParticipation.user_id == user_id,
-                EventParticipation.event_id == event_id,
-                EventParticipation.status != ParticipationStatus.CANCELLED
-            )
-        )
-        total_count = total_count_result.scalar() or 0
+        total_count = await count_active_participations(db, user_id, event_id)
 
         if total_count >= event.max_checkins_per_user:
             raise HTTPException(
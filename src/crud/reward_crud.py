@@ -1,11 +1,12 @@
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_, or_
-from src.models.reward import Reward, UserReward
+from sqlalchemy import and_, or_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from src.models.reward import Reward, UserReward, USER_REWARD_MONTHLY_CONSTRAINT
 from src.schemas.reward_schema import RewardCreate, RewardUpdate
 from src.models.event_participation import EventParticipation, ParticipationStatus
 from src.models.event import Event
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime, timedelta, timezone
 import pytz
 import logging
@@ -64,6 +65,25 @@ async def get_user_rewards(db: AsyncSession, user_id: int) -> List[UserReward]:
     return result.scalars().all()
 
 
+async def get_rewards_for_users(db: AsyncSession, user_ids: List[int]) -> Dict[int, List[UserReward]]:
+    """
+    รางวัลของหลาย user ใน query เดียว (แทนการเรียก get_user_rewards ทีละคน)
+    คืน {user_id: [UserReward, ...]} เรียงตาม earned_at ล่าสุดก่อน; user ที่ไม่มีรางวัลได้ list ว่าง
+    """
+    grouped: Dict[int, List[UserReward]] = {user_id: [] for user_id in user_ids}
+    if not grouped:
+        return grouped
+
+    result = await db.execute(
+        select(UserReward)
+        .where(UserReward.user_id.in_(list(grouped)))
+        .order_by(UserReward.user_id, UserReward.earned_at.desc())
+    )
+    for user_reward in result.scalars():
+        grouped[user_reward.user_id].append(user_reward)
+    return grouped
+
+
 async def check_and_award_rewards(db: AsyncSession, user_id: int):
     """
     ตรวจสอบและมอบรางวัล
@@ -74,80 +94,56 @@ async def check_and_award_rewards(db: AsyncSession, user_id: int):
     now_bkk = datetime.now(bangkok_tz)
     now_utc = datetime.now(timezone.utc)
 
+    # ตัดรอบตามเวลาไทย
+    current_month = now_bkk.month
+    current_year = now_bkk.year
+
     rewards = await get_rewards(db)
 
-    for reward in rewards:
-        # 1. เช็คว่าเดือนนี้ได้รางวัลไปหรือยัง (ตัดรอบตามเวลาไทย)
-        current_month = now_bkk.month
-        current_year = now_bkk.year
-
-        existing_reward = await db.execute(
-            select(UserReward).where(
-                and_(
-                    UserReward.user_id == user_id,
-                    UserReward.reward_id == reward.id,
-                    UserReward.earned_month == current_month,
-                    UserReward.earned_year == current_year
-                )
-            )
+    # 1. รางวัลที่ได้ไปแล้วเดือนนี้ (query เดียวแทนการเช็คทีละรางวัล)
+    earned_result = await db.execute(
+        select(UserReward.reward_id).where(
+            UserReward.user_id == user_id,
+            UserReward.earned_month == current_month,
+            UserReward.earned_year == current_year
         )
-        if existing_reward.scalar_one_or_none():
+    )
+    earned_reward_ids = set(earned_result.scalars().all())
+
+    # จำนวนครั้งที่สำเร็จ แยกตาม time_period_days (รางวัลที่ใช้ช่วงเวลาเดียวกันนับครั้งเดียว)
+    completed_counts = {}
+
+    for reward in rewards:
+        if reward.id in earned_reward_ids:
             continue
 
         # 2. นับจำนวนครั้งที่ทำสำเร็จ (Count Success)
-        # ✅ FIX: Use BKK time for consistency with checkin_date
-        start_date = now_bkk - timedelta(days=reward.time_period_days)
-        start_date_utc = now_utc - timedelta(days=reward.time_period_days) # Keep for db timestamp comparison
-
-        # รวมทั้งกรณีของกิจกรรมแบบรายวัน (daily check-in)
-        # - สำหรับ participation ที่มี completed_at/checked_out_at: ตรวจสอบ datetime (ใช้ UTC ใน DB)
-        # - สำหรับ daily check-in (Event.allow_daily_checkin): ตรวจสอบ EventParticipation.checkin_date (date - ใช้ BKK)
-        completed_count_result = await db.execute(
-            select(EventParticipation)
-            .join(Event, Event.id == EventParticipation.event_id)
-            .where(
-                and_(
-                    EventParticipation.user_id == user_id,
-                    or_(
-                        # ปกติ: ตรวจสอบ completed_at / checked_out_at โดยใช้ UTC (Timestamp)
-                        and_(
-                            EventParticipation.status.in_([
-                                ParticipationStatus.COMPLETED,
-                                ParticipationStatus.CHECKED_OUT
-                            ]),
-                            or_(
-                                EventParticipation.completed_at >= start_date_utc,
-                                EventParticipation.checked_out_at >= start_date_utc
-                            )
-                        ),
-                        # กรณี daily check-in: ใช้ Date (BKK)
-                        and_(
-                            Event.allow_daily_checkin,
-                            EventParticipation.checkin_date.isnot(None),
-                            EventParticipation.checkin_date >= start_date.date(),
-                            EventParticipation.status.notin_([
-                                ParticipationStatus.CANCELLED,
-                                ParticipationStatus.EXPIRED
-                            ])
-                        )
-                    )
-                )
-            )
-        )
-        completed_participations = completed_count_result.scalars().all()
+        completed_count = completed_counts.get(reward.time_period_days)
+        if completed_count is None:
+            completed_count = await _count_completions(db, user_id, reward.time_period_days, now_bkk, now_utc)
+            completed_counts[reward.time_period_days] = completed_count
 
-        if len(completed_participations) >= reward.required_completions:
+        if completed_count >= reward.required_completions:
             try:
-                user_reward = UserReward(
-                    user_id=user_id,
-                    reward_id=reward.id,
-                    earned_month=current_month,
-                    earned_year=current_year,
-                    earned_at=now_utc
+                # ON CONFLICT DO NOTHING: ถ้ามีคนมอบรางวัลเดียวกันไปแล้ว (เรียกซ้ำ/พร้อมกัน) จะไม่เกิดแถวซ้ำ
+                result = await db.execute(
+                    pg_insert(UserReward)
+                    .values(
+                        user_id=user_id,
+                        reward_id=reward.id,
+                        earned_month=current_month,
+                        earned_year=current_year,
+                        earned_at=now_utc
+                    )
+                    .on_conflict_do_nothing(constraint=USER_REWARD_MONTHLY_CONSTRAINT)
+                    .returning(UserReward.id)
                 )
-                db.add(user_reward)
+                inserted = result.scalar_one_or_none() is not None
                 await db.commit()
-                
+
+                if not inserted:
+                    continue
+
                 logger.info(f"🏆 Awarded reward '{reward.name}' to user {user_id}")
 
                 # Import here to avoid circular imports
@@ -156,4 +152,57 @@ async def check_and_award_rewards(db: AsyncSession, user_id: int):
                     db, user_id, reward.id, reward.name
                 )
             except Exception as e:
-                logger.error(f"❌ Failed to award reward: {e}")
\ No newline at end of file
+                # คืน session จากสถานะ aborted (เช่น DB ยังไม่ได้รัน migration_user_rewards_unique.sql
+                # จึงไม่มี constraint uq_user_reward_monthly ให้ ON CONFLICT อ้างถึง)
+                await db.rollback()
+                logger.error(f"❌ Failed to award reward: {e}")
+
+
+async def _count_completions(
+    db: AsyncSession,
+    user_id: int,
+    time_period_days: int,
+    now_bkk: datetime,
+    now_utc: datetime
+) -> int:
+    """นับจำนวนครั้งที่ทำสำเร็จภายใน time_period_days วัน (COUNT ฝั่ง DB ไม่ต้องโหลดทุกแถว)"""
+    # ✅ FIX: Use BKK time for consistency with checkin_date
+    start_date = now_bkk - timedelta(days=time_period_days)
+    start_date_utc = now_utc - timedelta(days=time_period_days) # Keep for db timestamp comparison
+
+    # รวมทั้งกรณีของกิจกรรมแบบรายวัน (daily check-in)
+    # - สำหรับ participation ที่มี completed_at/checked_out_at: ตรวจสอบ datetime (ใช้ UTC ใน DB)
+    # - สำหรับ daily check-in (Event.allow_daily_checkin): ตรวจสอบ EventParticipation.checkin_date (date - ใช้ BKK)
+    result = await db.execute(
+        select(func.count(EventParticipation.id))
+        .join(Event, Event.id == EventParticipation.event_id)
+        .where(
+            and_(
+                EventParticipation.user_id == user_id,
+                or_(
+                    # ปกติ: ตรวจสอบ completed_at / checked_out_at โดยใช้ UTC (Timestamp)
+                    and_(
+                        EventParticipation.status.in_([
+                            ParticipationStatus.COMPLETED,
+                            ParticipationStatus.CHECKED_OUT
+                        ]),
+                        or_(
+                            EventParticipation.completed_at >= start_date_utc,
+                            EventParticipation.checked_out_at >= start_date_utc
+                        )
+                    ),
+                    # กรณี daily check-in: ใช้ Date (BKK)
+                    and_(
+                        Event.allow_daily_checkin,
+                        EventParticipation.checkin_date.isnot(None),
+                        EventParticipation.checkin_date >= start_date.date(),
+                        EventParticipation.status.notin_([
+                            ParticipationStatus.CANCELLED,
+                            ParticipationStatus.EXPIRED
+                        ])
+                    )
+                )
+            )
+        )
+    )
+    return result.scalar_one()
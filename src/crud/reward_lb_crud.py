@@ -332,6 +332,18 @@ async def calculate_and_allocate_rewards(
     if not config:
         raise ValueError("Leaderboard config not found")
 
+    stats = await _allocate_rewards(db, config)
+    await db.commit()
+    return stats
+
+
+async def _allocate_rewards(
+    db: AsyncSession,
+    config: RewardLeaderboardConfig
+) -> Dict[str, Any]:
+    """จัดอันดับ + มอบรางวัลให้ entries ของ config (ไม่ commit; ผู้เรียกเป็นคน commit)"""
+    config_id = config.id
+
     # ✅ FIX: Extract scalar values to variables (avoid accessing ORM inside lambda/loop)
     default_required_completions = config.required_completions
     global_inventory = config.max_reward_recipients
@@ -428,7 +440,6 @@ async def calculate_and_allocate_rewards(
 
         current_rank += 1
 
-    await db.commit()
     return stats
 
 
@@ -444,7 +455,9 @@ async def finalize_leaderboard(
     if config.finalized_at:
         raise ValueError("Leaderboard already finalized")
 
-    await calculate_and_allocate_rewards(db, config_id)
+    # คำนวณอันดับสุดท้ายและปิด leaderboard ใน transaction เดียว
+    # entries ที่ได้คือ snapshot (update_entry_progress ไม่แก้ config ที่ finalized แล้ว)
+    await _allocate_rewards(db, config)
 
     config.finalized_at = datetime.now(timezone.utc)
     await db.commit()
@@ -7,8 +7,15 @@ import os
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+# query_cache_size: compiled-statement cache (default 500) sized for the app's query variety
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=True,
+    query_cache_size=1200,
+    pool_size=DB_POOL_SIZE,
+)
 SessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 async def init_db():
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 
 from src.models.base import Base
 
+# รางวัลเดียวกันได้ครั้งเดียวต่อเดือน (ใช้กับ INSERT ... ON CONFLICT DO NOTHING ตอนมอบรางวัล)
+USER_REWARD_MONTHLY_CONSTRAINT = "uq_user_reward_monthly"
+
 
 class Reward(Base):
     """รางวัลหรือ Badge ที่ผู้ใช้จะได้รับ"""
@@ -30,6 +33,9 @@ class Reward(Base):
 class UserReward(Base):
     """รางวัลที่ผู้ใช้ได้รับ"""
     __tablename__ = "user_rewards"
+    __table_args__ = (
+        UniqueConstraint('user_id', 'reward_id', 'earned_year', 'earned_month', name=USER_REWARD_MONTHLY_CONSTRAINT),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
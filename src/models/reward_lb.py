@@ -2,7 +2,7 @@
 Reward Leaderboard Models
 Save as: src/models/reward_lb.py
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Numeric, Text, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Numeric, Text, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 # Ensure this import matches your project structure (src.models.base or src.db.session)
@@ -58,6 +58,10 @@ class RewardLeaderboardConfig(Base):
 class RewardLeaderboardEntry(Base):
     """ตารางรายการผู้เข้าร่วม Leaderboard"""
     __tablename__ = "reward_leaderboard_entries"
+    __table_args__ = (
+        # อ่าน leaderboard ตามอันดับของ config เดียว (get_leaderboard_entries) เป็น index scan
+        Index('ix_lb_entries_config_rank', 'config_id', 'rank'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     config_id = Column(Integer, ForeignKey("reward_leaderboard_configs.id"), nullable=False, index=True)
@@ -2,18 +2,23 @@
 ⏰ Scheduler Service - Auto unlock/lock for Multi-day Events
 Handles automatic daily code generation and expiration with strict daily reset logic.
 """
+import asyncio
+import functools
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime, date, timezone, timedelta
 import pytz  # เพิ่มการจัดการ Timezone
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func, not_, or_
-from src.database.db_config import SessionLocal
+from sqlalchemy import select, and_, func, not_, or_, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from src.database.db_config import SessionLocal, engine
 from src.models.event import Event, EventType
 from src.models.event_participation import EventParticipation, ParticipationStatus
 from src.models.user import User
 from src.crud import reward_lb_crud
+from src.crud.event_participation_crud import generate_unique_join_codes
 
 
 logger = logging.getLogger(__name__)
@@ -23,7 +28,65 @@ scheduler = AsyncIOScheduler()
 # ✅ กำหนด Timezone สำหรับประเทศไทย
 BANGKOK_TZ = pytz.timezone('Asia/Bangkok')
 
+# จำนวน event สูงสุดที่ finalize พร้อมกัน (จำกัดจำนวน DB connection ที่ใช้พร้อมกัน)
+FINALIZE_CONCURRENCY = 4
 
+# ถ้าจำนวน participation ที่ต้องสร้างเกินค่านี้ จะใช้ COPY ของ asyncpg แทน INSERT ผ่าน ORM
+COPY_INSERT_THRESHOLD = 5000
+
+# คอลัมน์ที่ส่งผ่าน COPY (ต้องใส่ค่าที่ปกติ ORM เติมให้ เช่น rejoin_count/updated_at เอง)
+_COPY_COLUMNS = (
+    "user_id", "event_id", "join_code", "status", "checkin_date",
+    "code_used", "code_expires_at", "rejoin_count", "joined_at", "updated_at",
+)
+
+_COPY_STAGING_TABLE = "tmp_daily_participations"
+
+# unique (user_id, event_id, checkin_date) ใช้เป็นเป้าของ ON CONFLICT ตอนสร้างรายการรายวัน
+DAILY_CHECKIN_CONSTRAINT = "uq_event_user_daily_checkin"
+
+# Postgres advisory lock keys (หนึ่ง key ต่อหนึ่ง job) ใช้เลือก instance เดียวให้รัน job
+UNLOCK_LOCK_KEY = 42001
+EXPIRE_LOCK_KEY = 42002
+FINALIZE_LOCK_KEY = 42003
+
+
+@asynccontextmanager
+async def _advisory_lock(key: int):
+    """
+    ถือ session-level advisory lock บน connection แยกตลอดช่วงที่ job ทำงาน
+    yield True ถ้าได้ lock, False ถ้า instance อื่นถืออยู่แล้ว
+    """
+    async with engine.connect() as conn:
+        acquired = (await conn.execute(
+            text("SELECT pg_try_advisory_lock(:k)"), {"k": key}
+        )).scalar()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": key})
+
+
+def _run_exclusively(lock_key: int):
+    """
+    🔐 Decorator: ให้ job รันได้ทีละ instance แม้ทุก replica จะเปิด scheduler
+    """
+    def decorator(job):
+        @functools.wraps(job)
+        async def wrapper(*args, **kwargs):
+            # ไม่ดัก exception ที่นี่: job แต่ละตัวจัดการ error ของตัวเองแล้ว
+            # ความผิดพลาดตอนขอ/คืน lock (เช่น DB ล่ม) ต้องไปถึง APScheduler พร้อม traceback
+            async with _advisory_lock(lock_key) as acquired:
+                if not acquired:
+                    logger.info(f"⏭️ {job.__name__}: lock held by peer, skipping")
+                    return None
+                return await job(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@_run_exclusively(EXPIRE_LOCK_KEY)
 async def auto_expire_unused_codes():
     """
     🔒 Auto-expire: เปลี่ยนสถานะทุกรายการที่ยังไม่สำเร็จให้เป็น EXPIRED
@@ -88,6 +151,36 @@ async def auto_expire_unused_codes():
             await db.rollback()
 
 
+async def _copy_participations(db: AsyncSession, rows: list) -> int:
+    """
+    📦 Bulk insert ด้วย COPY ผ่าน asyncpg connection ของ session (อยู่ใน transaction เดียวกัน)
+    
+    COPY ไม่รองรับ ON CONFLICT จึง COPY ลง temp table ก่อนแล้วค่อย INSERT ... SELECT
+    Returns: จำนวนแถวที่ insert จริง
+    """
+    table = EventParticipation.__tablename__
+    columns = ", ".join(_COPY_COLUMNS)
+    await db.execute(text(
+        f"CREATE TEMP TABLE {_COPY_STAGING_TABLE} ON COMMIT DROP AS "
+        f"SELECT {columns} FROM {table} WITH NO DATA"
+    ))
+    
+    conn = await db.connection()
+    raw_conn = await conn.get_raw_connection()
+    await raw_conn.driver_connection.copy_records_to_table(
+        _COPY_STAGING_TABLE,
+        records=[tuple(row[column] for column in _COPY_COLUMNS) for row in rows],
+        columns=list(_COPY_COLUMNS)
+    )
+    
+    result = await db.execute(text(
+        f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {_COPY_STAGING_TABLE} "
+        f"ON CONFLICT ON CONSTRAINT {DAILY_CHECKIN_CONSTRAINT} DO NOTHING"
+    ))
+    return result.rowcount
+
+
+@_run_exclusively(UNLOCK_LOCK_KEY)
 async def auto_unlock_daily_codes():
     """
     🔓 Auto-unlock: สร้างรหัสใหม่สำหรับ Multi-day Events
@@ -133,89 +226,81 @@ async def auto_unlock_daily_codes():
             
             logger.info(f"   📅 Found {len(active_events)} active events.")
             
+            # หมดอายุตอนสิ้นวันของ 'วันนี้' (BKK)
+            code_expires_at = BANGKOK_TZ.localize(datetime.combine(today, datetime.max.time()))
+            
             for event in active_events:
-                # หาผู้ใช้ที่เคยลงทะเบียนกิจกรรมนี้ (Pre-registered)
-                # ✅ แก้ไข: ดึงเฉพาะ user ที่มี participation ที่ไม่ใช่ CANCELLED
-                users_result = await db.execute(
-                    select(EventParticipation.user_id)
-                    .where(
+                # หาผู้ใช้ที่เคยลงทะเบียนกิจกรรมนี้ (Pre-registered) พร้อมโควต้าที่ใช้ไป ใน query เดียว
+                # - ต้องมี participation ที่ไม่ใช่ CANCELLED อย่างน้อย 1 รายการ
+                # - ต้องยังไม่มีรายการของ 'วันนี้' (unique constraint กันซ้ำอีกชั้นตอน insert)
+                # - นับโควต้าเฉพาะที่ไม่ใช่ EXPIRED และ CANCELLED
+                candidates_result = await db.execute(
+                    select(
+                        EventParticipation.user_id,
+                        func.count(EventParticipation.id).filter(
+                            not_(EventParticipation.status.in_([
+                                ParticipationStatus.EXPIRED,
+                                ParticipationStatus.CANCELLED
+                            ]))
+                        ).label("total_usage")
+                    )
+                    .where(EventParticipation.event_id == event.id)
+                    .group_by(EventParticipation.user_id)
+                    .having(
                         and_(
-                            EventParticipation.event_id == event.id,
-                            EventParticipation.status != ParticipationStatus.CANCELLED
+                            func.count(EventParticipation.id).filter(
+                                EventParticipation.status != ParticipationStatus.CANCELLED
+                            ) > 0,
+                            func.count(EventParticipation.id).filter(
+                                EventParticipation.checkin_date == today
+                            ) == 0
                         )
                     )
-                    .distinct()
                 )
-                registered_user_ids = [row[0] for row in users_result.fetchall()]
+                candidates = candidates_result.all()
                 
-                logger.info(f"   🎯 Event '{event.title}': Checking {len(registered_user_ids)} candidates.")
+                logger.info(f"   🎯 Event '{event.title}': Checking {len(candidates)} candidates.")
                 
-                codes_created = 0
+                if event.max_checkins_per_user:
+                    eligible_user_ids = [
+                        user_id for user_id, total_usage in candidates
+                        if total_usage < event.max_checkins_per_user
+                    ]
+                else:
+                    eligible_user_ids = [user_id for user_id, _ in candidates]
                 
-                for user_id in registered_user_ids:
-                    # 1. Check if user already has TODAY'S participation
-                    # ต้องไม่นับ EXPIRED ของเมื่อวาน แต่ถ้ารายการของ 'วันนี้' เป็น EXPIRED (ซึ่งไม่น่าเกิดตอน 00:00) ก็ถือว่ามีแล้ว
-                    # เราเช็คแค่ checkin_date == today และ status != CANCELLED
-                    existing_today = await db.execute(
-                        select(EventParticipation).where(
-                            and_(
-                                EventParticipation.user_id == user_id,
-                                EventParticipation.event_id == event.id,
-                                EventParticipation.checkin_date == today,
-                                EventParticipation.status != ParticipationStatus.CANCELLED
-                            )
-                        )
-                    )
-                    
-                    if existing_today.scalar_one_or_none():
-                        logger.debug(f"      - User {user_id}: ⏭️ Skip - Already has today's participation")
-                        continue  # มีของวันนี้แล้ว (อาจจะสร้างเองหรือระบบสร้างให้แล้ว)
-                    
-                    # 2. Check Quota (Max Check-ins)
-                    # ✅ แก้ไข: ไม่นับทั้ง EXPIRED และ CANCELLED
-                    if event.max_checkins_per_user:
-                        quota_query = select(func.count(EventParticipation.id)).where(
-                            and_(
-                                EventParticipation.user_id == user_id,
-                                EventParticipation.event_id == event.id,
-                                # ✅ นับเฉพาะที่ไม่ใช่ EXPIRED และ CANCELLED
-                                not_(EventParticipation.status.in_([
-                                    ParticipationStatus.EXPIRED,
-                                    ParticipationStatus.CANCELLED
-                                ]))
-                            )
-                        )
-                        quota_result = await db.execute(quota_query)
-                        total_usage = quota_result.scalar() or 0
-                        
-                        if total_usage >= event.max_checkins_per_user:
-                            logger.debug(f"      - User {user_id}: ⏭️ Skip - Quota full ({total_usage}/{event.max_checkins_per_user})")
-                            continue
-                    
-                    # 3. Create New Participation
-                    from src.crud.event_participation_crud import generate_join_code, get_participation_by_join_code
-                    
-                    join_code = generate_join_code()
-                    while await get_participation_by_join_code(db, join_code):
-                        join_code = generate_join_code()
-                    
-                    # หมดอายุตอนสิ้นวันของ 'วันนี้' (BKK)
-                    code_expires_at = BANGKOK_TZ.localize(datetime.combine(today, datetime.max.time()))
-                    
-                    new_participation = EventParticipation(
-                        user_id=user_id,
-                        event_id=event.id,
-                        join_code=join_code,
-                        status=ParticipationStatus.JOINED,
-                        checkin_date=today,
-                        code_used=False,
-                        code_expires_at=code_expires_at,
-                        joined_at=datetime.now(timezone.utc)
+                # สร้าง participation ของวันนี้
+                join_codes = await generate_unique_join_codes(db, len(eligible_user_ids))
+                now_utc = datetime.now(timezone.utc)
+                new_rows = [
+                    {
+                        "user_id": user_id,
+                        "event_id": event.id,
+                        "join_code": join_code,
+                        "status": ParticipationStatus.JOINED.value,
+                        "checkin_date": today,
+                        "code_used": False,
+                        "code_expires_at": code_expires_at,
+                        "rejoin_count": 0,
+                        "joined_at": now_utc,
+                        "updated_at": now_utc,
+                    }
+                    for user_id, join_code in zip(eligible_user_ids, join_codes)
+                ]
+                
+                # ON CONFLICT DO NOTHING: ถ้า user กด join เองพร้อมกันตอน 00:00 ก็ข้ามไปโดยไม่ทำให้ทั้ง job ล้ม
+                if not new_rows:
+                    codes_created = 0
+                elif len(new_rows) > COPY_INSERT_THRESHOLD:
+                    codes_created = await _copy_participations(db, new_rows)
+                else:
+                    insert_result = await db.execute(
+                        pg_insert(EventParticipation)
+                        .on_conflict_do_nothing(constraint=DAILY_CHECKIN_CONSTRAINT)
+                        .returning(EventParticipation.id),
+                        new_rows
                     )
-                    
-                    db.add(new_participation)
-                    codes_created += 1
-                    logger.debug(f"      - User {user_id}: ✅ Created new participation")
+                    codes_created = len(insert_result.all())
                 
                 await db.commit()
                 logger.info(f"   ✅ Event '{event.title}': Created {codes_created} new codes.")
@@ -227,6 +312,7 @@ async def auto_unlock_daily_codes():
             await db.rollback()
 
 
+@_run_exclusively(FINALIZE_LOCK_KEY)
 async def auto_finalize_ended_single_day_events():
     """
     🏆 Auto-finalize: สรุปผลรางวัลสำหรับ Single-Day Events ที่จบแล้ว
@@ -258,18 +344,31 @@ async def auto_finalize_ended_single_day_events():
                 .group_by(Event.id)
             )
             
-            events = result.all()
-            finalized_count = 0
+            events = [row[0] for row in result.all()]
             
-            for row in events:
-                event = row[0]
-                config = await reward_lb_crud.get_leaderboard_config_by_event(db, event.id)
-                
-                if config and not config.finalized_at:
+            # ✅ Finalize หลาย event พร้อมกัน โดยแต่ละ event ใช้ session ของตัวเอง
+            # (AsyncSession ใช้ร่วมกันข้าม task ไม่ได้) และจำกัดด้วย Semaphore
+            sem = asyncio.Semaphore(FINALIZE_CONCURRENCY)
+            
+            async def _finalize(event: Event) -> bool:
+                async with sem, SessionLocal() as event_db:
+                    config = await reward_lb_crud.get_leaderboard_config_by_event(event_db, event.id)
+                    if not config or config.finalized_at:
+                        return False
                     logger.info(f"   🔄 Finalizing event: {event.title} (ID: {event.id})")
-                    success = await reward_lb_crud.auto_finalize_single_day_rewards(db, event.id)
-                    if success:
-                        finalized_count += 1
+                    return await reward_lb_crud.auto_finalize_single_day_rewards(event_db, event.id)
+            
+            results = await asyncio.gather(
+                *(_finalize(event) for event in events),
+                return_exceptions=True
+            )
+            
+            finalized_count = 0
+            for event, outcome in zip(events, results):
+                if isinstance(outcome, Exception):
+                    logger.error(f"   ❌ Failed to finalize event {event.id}: {str(outcome)}")
+                elif outcome:
+                    finalized_count += 1
             
             logger.info(f"   ✅ Auto-finalize completed. Finalized {finalized_count} events.")
             
@@ -282,8 +381,9 @@ def start_scheduler():
     """
     🚀 เริ่มต้น scheduler โดยใช้ Timezone Asia/Bangkok
     
-    Note: In load-balanced environments, only one instance should run the scheduler.
-    Set ENABLE_SCHEDULER=false on secondary instances to prevent duplicate jobs.
+    Note: Each job takes a Postgres advisory lock before running, so in load-balanced
+    environments only one instance executes a given job even if all instances start
+    the scheduler. ENABLE_SCHEDULER=false can still be used to disable it entirely.
     """
     import os
     
@@ -5,9 +5,23 @@ This module contains all application-wide constants, enums, and configuration va
 used throughout the KU-RUN Check-in backend system.
 """
 
+import re
+import sys
 from enum import Enum
 from typing import Final
 
+class FastLookupEnum(Enum):
+    """Enum base with a value -> member lookup that skips Enum.__call__"""
+
+    @classmethod
+    def from_value(cls, value):
+        """Return the member for value (single dict hit on the class value map)"""
+        try:
+            return cls._value2member_map_[value]
+        except (KeyError, TypeError):
+            raise ValueError(f"{value!r} is not a valid {cls.__qualname__}") from None
+
+
 # ============================================================================
 # API Response Constants
 # ============================================================================
@@ -41,7 +55,7 @@ class AuthConstants:
     SESSION_TIMEOUT_MINUTES: Final[int] = 30
 
 
-class UserRole(str, Enum):
+class UserRole(str, FastLookupEnum):
     """User role enumeration"""
     ADMIN = "admin"
     ORGANIZER = "organizer"
@@ -50,7 +64,7 @@ class UserRole(str, Enum):
     GUEST = "guest"
 
 
-class Permission(str, Enum):
+class Permission(str, FastLookupEnum):
     """Permission enumeration"""
     CREATE_EVENT = "create_event"
     EDIT_EVENT = "edit_event"
@@ -66,7 +80,7 @@ class Permission(str, Enum):
 # Event & Check-in Constants
 # ============================================================================
 
-class EventStatus(str, Enum):
+class EventStatus(str, FastLookupEnum):
     """Event status enumeration"""
     DRAFT = "draft"
     SCHEDULED = "scheduled"
@@ -76,7 +90,7 @@ class EventStatus(str, Enum):
     POSTPONED = "postponed"
 
 
-class CheckinStatus(str, Enum):
+class CheckinStatus(str, FastLookupEnum):
     """Check-in status enumeration"""
     PENDING = "pending"
     CHECKED_IN = "checked_in"
@@ -85,7 +99,7 @@ class CheckinStatus(str, Enum):
     EXCUSED_ABSENCE = "excused_absence"
 
 
-class EventType(str, Enum):
+class EventType(str, FastLookupEnum):
     """Event type enumeration"""
     RACE = "race"
     TRAINING = "training"
@@ -108,7 +122,7 @@ class EventConstants:
 # Participant & Registration Constants
 # ============================================================================
 
-class RegistrationStatus(str, Enum):
+class RegistrationStatus(str, FastLookupEnum):
     """Registration status enumeration"""
     PENDING = "pending"
     CONFIRMED = "confirmed"
@@ -117,7 +131,7 @@ class RegistrationStatus(str, Enum):
     REGISTERED = "registered"
 
 
-class ParticipantStatus(str, Enum):
+class ParticipantStatus(str, FastLookupEnum):
     """Participant status enumeration"""
     ACTIVE = "active"
     INACTIVE = "inactive"
@@ -137,7 +151,7 @@ class ParticipantConstants:
 # Notification Constants
 # ============================================================================
 
-class NotificationType(str, Enum):
+class NotificationType(str, FastLookupEnum):
     """Notification type enumeration"""
     EVENT_REMINDER = "event_reminder"
     REGISTRATION_CONFIRMED = "registration_confirmed"
@@ -147,7 +161,7 @@ class NotificationType(str, Enum):
     GENERAL_ANNOUNCEMENT = "general_announcement"
 
 
-class NotificationChannel(str, Enum):
+class NotificationChannel(str, FastLookupEnum):
     """Notification channel enumeration"""
     EMAIL = "email"
     SMS = "sms"
@@ -155,7 +169,7 @@ class NotificationChannel(str, Enum):
     IN_APP = "in_app"
 
 
-class NotificationStatus(str, Enum):
+class NotificationStatus(str, FastLookupEnum):
     """Notification status enumeration"""
     PENDING = "pending"
     SENT = "sent"
@@ -169,14 +183,14 @@ class NotificationConstants:
     EMAIL_SUBJECT_MAX_LENGTH: Final[int] = 256
     EMAIL_BODY_MAX_LENGTH: Final[int] = 5000
     NOTIFICATION_RETENTION_DAYS: Final[int] = 90
-    REMINDER_HOURS_BEFORE_EVENT: Final[list] = [24, 1]  # Send reminders 24h and 1h before
+    REMINDER_HOURS_BEFORE_EVENT: Final[tuple] = (24, 1)  # Send reminders 24h and 1h before
 
 
 # ============================================================================
 # Report & Analytics Constants
 # ============================================================================
 
-class ReportType(str, Enum):
+class ReportType(str, FastLookupEnum):
     """Report type enumeration"""
     ATTENDANCE = "attendance"
     REGISTRATION = "registration"
@@ -185,7 +199,7 @@ class ReportType(str, Enum):
     ENGAGEMENT = "engagement"
 
 
-class ReportFormat(str, Enum):
+class ReportFormat(str, FastLookupEnum):
     """Report format enumeration"""
     PDF = "pdf"
     CSV = "csv"
@@ -211,6 +225,56 @@ class ValidationConstants:
     USERNAME_MAX_LENGTH: Final[int] = 50
     USERNAME_REGEX: Final[str] = r"^[a-zA-Z0-9_-]+$"
     PASSWORD_REGEX: Final[str] = r"^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$"
+    PASSWORD_MIN_LENGTH: Final[int] = 8
+    PASSWORD_SPECIAL_CHARS: Final[frozenset] = frozenset("@$!%*?&")
+
+    # Compiled once at import time so validators skip the regex cache lookup per call
+    EMAIL_PATTERN: Final[re.Pattern] = re.compile(EMAIL_REGEX)
+    PHONE_PATTERN: Final[re.Pattern] = re.compile(PHONE_REGEX)
+    USERNAME_PATTERN: Final[re.Pattern] = re.compile(USERNAME_REGEX)
+
+
+def is_valid_email(value: str) -> bool:
+    """Check value against ValidationConstants.EMAIL_REGEX"""
+    return ValidationConstants.EMAIL_PATTERN.match(value) is not None
+
+
+def is_valid_phone(value: str) -> bool:
+    """Check value against ValidationConstants.PHONE_REGEX"""
+    return ValidationConstants.PHONE_PATTERN.match(value) is not None
+
+
+def is_valid_username(value: str) -> bool:
+    """Check value against ValidationConstants.USERNAME_REGEX and length limits"""
+    return (
+        ValidationConstants.USERNAME_MIN_LENGTH <= len(value) <= ValidationConstants.USERNAME_MAX_LENGTH
+        and ValidationConstants.USERNAME_PATTERN.match(value) is not None
+    )
+
+
+def is_strong_password(value: str) -> bool:
+    """
+    Equivalent to matching ValidationConstants.PASSWORD_REGEX, but done in a single
+    pass over the string instead of four lookaheads (a trailing newline, which `$`
+    would tolerate, is rejected).
+    """
+    if len(value) < ValidationConstants.PASSWORD_MIN_LENGTH:
+        return False
+
+    special_chars = ValidationConstants.PASSWORD_SPECIAL_CHARS
+    has_lower = has_upper = has_digit = has_special = False
+    for ch in value:
+        if "a" <= ch <= "z":
+            has_lower = True
+        elif "A" <= ch <= "Z":
+            has_upper = True
+        elif ch.isdecimal():
+            has_digit = True
+        elif ch in special_chars:
+            has_special = True
+        else:
+            return False
+    return has_lower and has_upper and has_digit and has_special
 
 
 # ============================================================================
@@ -225,7 +289,7 @@ class PaginationConstants:
     DEFAULT_PAGE_NUMBER: Final[int] = 1
 
 
-class SortOrder(str, Enum):
+class SortOrder(str, FastLookupEnum):
     """Sort order enumeration"""
     ASC = "asc"
     DESC = "desc"
@@ -251,9 +315,9 @@ class TimeConstants:
 class FileConstants:
     """File upload and storage related constants"""
     MAX_FILE_SIZE_MB: Final[int] = 10
-    MAX_FILE_SIZE_BYTES: Final[int] = 10 * 1024 * 1024
-    ALLOWED_IMAGE_EXTENSIONS: Final[list] = [".jpg", ".jpeg", ".png", ".gif", ".webp"]
-    ALLOWED_DOCUMENT_EXTENSIONS: Final[list] = [".pdf", ".doc", ".docx", ".xlsx", ".csv"]
+    MAX_FILE_SIZE_BYTES: Final[int] = MAX_FILE_SIZE_MB * 1024 * 1024
+    ALLOWED_IMAGE_EXTENSIONS: Final[frozenset] = frozenset({".jpg", ".jpeg", ".png", ".gif", ".webp"})
+    ALLOWED_DOCUMENT_EXTENSIONS: Final[frozenset] = frozenset({".pdf", ".doc", ".docx", ".xlsx", ".csv"})
     UPLOAD_DIRECTORY: Final[str] = "uploads/"
     TEMP_UPLOAD_DIRECTORY: Final[str] = "temp_uploads/"
 
@@ -276,42 +340,74 @@ class CacheConstants:
 # Error Messages
 # ============================================================================
 
+# Module-level names so hot paths resolve a message with one global lookup;
+# interned so identity/equality checks on them are pointer comparisons.
+ERR_INVALID_CREDENTIALS: Final[str] = sys.intern("Invalid username or password")
+ERR_TOKEN_EXPIRED: Final[str] = sys.intern("Token has expired")
+ERR_TOKEN_INVALID: Final[str] = sys.intern("Invalid token")
+ERR_UNAUTHORIZED_ACCESS: Final[str] = sys.intern("Unauthorized access")
+ERR_RESOURCE_NOT_FOUND: Final[str] = sys.intern("Resource not found")
+ERR_RESOURCE_ALREADY_EXISTS: Final[str] = sys.intern("Resource already exists")
+ERR_INVALID_INPUT: Final[str] = sys.intern("Invalid input provided")
+ERR_SERVER_ERROR: Final[str] = sys.intern("Internal server error")
+ERR_SERVICE_UNAVAILABLE: Final[str] = sys.intern("Service is temporarily unavailable")
+ERR_EMAIL_ALREADY_EXISTS: Final[str] = sys.intern("Email already registered")
+ERR_USERNAME_ALREADY_EXISTS: Final[str] = sys.intern("Username already taken")
+ERR_EVENT_NOT_FOUND: Final[str] = sys.intern("Event not found")
+ERR_PARTICIPANT_NOT_FOUND: Final[str] = sys.intern("Participant not found")
+ERR_INVALID_EVENT_STATUS: Final[str] = sys.intern("Invalid event status")
+ERR_REGISTRATION_CLOSED: Final[str] = sys.intern("Registration for this event is closed")
+ERR_EVENT_FULL: Final[str] = sys.intern("Event is at full capacity")
+ERR_DUPLICATE_CHECKIN: Final[str] = sys.intern("Participant already checked in for this event")
+
+
 class ErrorMessages:
     """Application error messages"""
-    INVALID_CREDENTIALS = "Invalid username or password"
-    TOKEN_EXPIRED = "Token has expired"
-    TOKEN_INVALID = "Invalid token"
-    UNAUTHORIZED_ACCESS = "Unauthorized access"
-    RESOURCE_NOT_FOUND = "Resource not found"
-    RESOURCE_ALREADY_EXISTS = "Resource already exists"
-    INVALID_INPUT = "Invalid input provided"
-    SERVER_ERROR = "Internal server error"
-    SERVICE_UNAVAILABLE = "Service is temporarily unavailable"
-    EMAIL_ALREADY_EXISTS = "Email already registered"
-    USERNAME_ALREADY_EXISTS = "Username already taken"
-    EVENT_NOT_FOUND = "Event not found"
-    PARTICIPANT_NOT_FOUND = "Participant not found"
-    INVALID_EVENT_STATUS = "Invalid event status"
-    REGISTRATION_CLOSED = "Registration for this event is closed"
-    EVENT_FULL = "Event is at full capacity"
-    DUPLICATE_CHECKIN = "Participant already checked in for this event"
+    INVALID_CREDENTIALS: Final[str] = ERR_INVALID_CREDENTIALS
+    TOKEN_EXPIRED: Final[str] = ERR_TOKEN_EXPIRED
+    TOKEN_INVALID: Final[str] = ERR_TOKEN_INVALID
+    UNAUTHORIZED_ACCESS: Final[str] = ERR_UNAUTHORIZED_ACCESS
+    RESOURCE_NOT_FOUND: Final[str] = ERR_RESOURCE_NOT_FOUND
+    RESOURCE_ALREADY_EXISTS: Final[str] = ERR_RESOURCE_ALREADY_EXISTS
+    INVALID_INPUT: Final[str] = ERR_INVALID_INPUT
+    SERVER_ERROR: Final[str] = ERR_SERVER_ERROR
+    SERVICE_UNAVAILABLE: Final[str] = ERR_SERVICE_UNAVAILABLE
+    EMAIL_ALREADY_EXISTS: Final[str] = ERR_EMAIL_ALREADY_EXISTS
+    USERNAME_ALREADY_EXISTS: Final[str] = ERR_USERNAME_ALREADY_EXISTS
+    EVENT_NOT_FOUND: Final[str] = ERR_EVENT_NOT_FOUND
+    PARTICIPANT_NOT_FOUND: Final[str] = ERR_PARTICIPANT_NOT_FOUND
+    INVALID_EVENT_STATUS: Final[str] = ERR_INVALID_EVENT_STATUS
+    REGISTRATION_CLOSED: Final[str] = ERR_REGISTRATION_CLOSED
+    EVENT_FULL: Final[str] = ERR_EVENT_FULL
+    DUPLICATE_CHECKIN: Final[str] = ERR_DUPLICATE_CHECKIN
 
 
 # ============================================================================
 # Success Messages
 # ============================================================================
 
+MSG_CREATED_SUCCESSFULLY: Final[str] = sys.intern("Created successfully")
+MSG_UPDATED_SUCCESSFULLY: Final[str] = sys.intern("Updated successfully")
+MSG_DELETED_SUCCESSFULLY: Final[str] = sys.intern("Deleted successfully")
+MSG_REGISTERED_SUCCESSFULLY: Final[str] = sys.intern("Registered successfully")
+MSG_CHECKED_IN_SUCCESSFULLY: Final[str] = sys.intern("Checked in successfully")
+MSG_LOGIN_SUCCESSFUL: Final[str] = sys.intern("Login successful")
+MSG_LOGOUT_SUCCESSFUL: Final[str] = sys.intern("Logout successful")
+MSG_PASSWORD_CHANGED: Final[str] = sys.intern("Password changed successfully")
+MSG_EMAIL_VERIFIED: Final[str] = sys.intern("Email verified successfully")
+
+
 class SuccessMessages:
     """Application success messages"""
-    CREATED_SUCCESSFULLY = "Created successfully"
-    UPDATED_SUCCESSFULLY = "Updated successfully"
-    DELETED_SUCCESSFULLY = "Deleted successfully"
-    REGISTERED_SUCCESSFULLY = "Registered successfully"
-    CHECKED_IN_SUCCESSFULLY = "Checked in successfully"
-    LOGIN_SUCCESSFUL = "Login successful"
-    LOGOUT_SUCCESSFUL = "Logout successful"
-    PASSWORD_CHANGED = "Password changed successfully"
-    EMAIL_VERIFIED = "Email verified successfully"
+    CREATED_SUCCESSFULLY: Final[str] = MSG_CREATED_SUCCESSFULLY
+    UPDATED_SUCCESSFULLY: Final[str] = MSG_UPDATED_SUCCESSFULLY
+    DELETED_SUCCESSFULLY: Final[str] = MSG_DELETED_SUCCESSFULLY
+    REGISTERED_SUCCESSFULLY: Final[str] = MSG_REGISTERED_SUCCESSFULLY
+    CHECKED_IN_SUCCESSFULLY: Final[str] = MSG_CHECKED_IN_SUCCESSFULLY
+    LOGIN_SUCCESSFUL: Final[str] = MSG_LOGIN_SUCCESSFUL
+    LOGOUT_SUCCESSFUL: Final[str] = MSG_LOGOUT_SUCCESSFUL
+    PASSWORD_CHANGED: Final[str] = MSG_PASSWORD_CHANGED
+    EMAIL_VERIFIED: Final[str] = MSG_EMAIL_VERIFIED
 
 
 # ============================================================================
@@ -6,14 +6,59 @@ across the application, including custom exception classes and error
 response formatting.
 """
 
-from typing import Any, Dict, Optional
-from enum import Enum
+from typing import Any, Dict, Final, Literal, Optional, Union
+from enum import IntEnum
 import logging
 
+from src.utils.constants import FastLookupEnum
+
 logger = logging.getLogger(__name__)
 
 
-class ErrorCode(Enum):
+# Error codes are only ever compared and serialized, so the hot path works with
+# these plain strings; ErrorCode stays as the public enum for existing callers.
+# Client errors (4xx)
+BAD_REQUEST: Final[str] = "BAD_REQUEST"
+UNAUTHORIZED: Final[str] = "UNAUTHORIZED"
+FORBIDDEN: Final[str] = "FORBIDDEN"
+NOT_FOUND: Final[str] = "NOT_FOUND"
+CONFLICT: Final[str] = "CONFLICT"
+VALIDATION_ERROR: Final[str] = "VALIDATION_ERROR"
+UNPROCESSABLE_ENTITY: Final[str] = "UNPROCESSABLE_ENTITY"
+
+# Server errors (5xx)
+INTERNAL_SERVER_ERROR: Final[str] = "INTERNAL_SERVER_ERROR"
+SERVICE_UNAVAILABLE: Final[str] = "SERVICE_UNAVAILABLE"
+NOT_IMPLEMENTED: Final[str] = "NOT_IMPLEMENTED"
+
+# Application-specific errors
+DATABASE_ERROR: Final[str] = "DATABASE_ERROR"
+EXTERNAL_SERVICE_ERROR: Final[str] = "EXTERNAL_SERVICE_ERROR"
+AUTHENTICATION_ERROR: Final[str] = "AUTHENTICATION_ERROR"
+PERMISSION_ERROR: Final[str] = "PERMISSION_ERROR"
+
+ErrorCodeValue = Literal[
+    # Client errors (4xx)
+    "BAD_REQUEST",
+    "UNAUTHORIZED",
+    "FORBIDDEN",
+    "NOT_FOUND",
+    "CONFLICT",
+    "VALIDATION_ERROR",
+    "UNPROCESSABLE_ENTITY",
+    # Server errors (5xx)
+    "INTERNAL_SERVER_ERROR",
+    "SERVICE_UNAVAILABLE",
+    "NOT_IMPLEMENTED",
+    # Application-specific errors
+    "DATABASE_ERROR",
+    "EXTERNAL_SERVICE_ERROR",
+    "AUTHENTICATION_ERROR",
+    "PERMISSION_ERROR",
+]
+
+
+class ErrorCode(str, FastLookupEnum):
     """Standard error codes for the application."""
     
     # Client errors (4xx)
@@ -37,8 +82,17 @@ class ErrorCode(Enum):
     PERMISSION_ERROR = "PERMISSION_ERROR"
 
 
-class HTTPStatusCode(Enum):
-    """HTTP status codes."""
+# Every error code string, e.g. for admin UI dropdowns
+ERROR_CODE_VALUES: Final[tuple] = tuple(member.value for member in ErrorCode)
+
+
+def _code_value(error_code: Union[ErrorCode, str]) -> str:
+    """Plain string for an ErrorCode member or an already-plain code string"""
+    return error_code.value if isinstance(error_code, ErrorCode) else error_code
+
+
+class HTTPStatusCode(IntEnum, FastLookupEnum):
+    """HTTP status codes (members are ints, so they serialize without .value)."""
     
     OK = 200
     CREATED = 201
@@ -59,7 +113,7 @@ class ApplicationException(Exception):
     
     def __init__(
         self,
-        error_code: ErrorCode,
+        error_code: Union[ErrorCode, ErrorCodeValue],
         message: str,
         status_code: HTTPStatusCode = HTTPStatusCode.INTERNAL_SERVER_ERROR,
         details: Optional[Dict[str, Any]] = None,
@@ -69,172 +123,147 @@ class ApplicationException(Exception):
         Initialize ApplicationException.
         
         Args:
-            error_code: Standard error code from ErrorCode enum
+            error_code: Standard error code (ErrorCode member or its plain string)
             message: Human-readable error message
             status_code: HTTP status code (defaults to 500)
             details: Additional error details as a dictionary
             cause: Original exception that caused this error
         """
-        self.error_code = error_code
+        self.error_code = _code_value(error_code)  # stored as a plain string
         self.message = message
         self.status_code = status_code
-        self.details = details or {}
+        self.details = details  # None when there is nothing to add
         self.cause = cause
+        # Snapshot the status once; to_dict/format_exception read it directly
+        self._status_int = int(status_code)
         
         super().__init__(self.message)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert exception to dictionary representation."""
-        return {
-            "error_code": self.error_code.value,
+        d = {
+            "error_code": self.error_code,
             "message": self.message,
-            "status_code": self.status_code.value,
-            "details": self.details,
+            "status_code": self._status_int,
         }
+        if self.details:
+            d["details"] = self.details
+        return d
+    
+    # Factories: ApplicationException.not_found("...") etc. return the matching subclass
+    
+    @staticmethod
+    def bad_request(message: Optional[str] = None, **kwargs) -> "BadRequestError":
+        return BadRequestError(message, **kwargs)
+    
+    @staticmethod
+    def unauthorized(message: Optional[str] = None, **kwargs) -> "UnauthorizedError":
+        return UnauthorizedError(message, **kwargs)
+    
+    @staticmethod
+    def forbidden(message: Optional[str] = None, **kwargs) -> "ForbiddenError":
+        return ForbiddenError(message, **kwargs)
+    
+    @staticmethod
+    def not_found(message: Optional[str] = None, **kwargs) -> "NotFoundError":
+        return NotFoundError(message, **kwargs)
+    
+    @staticmethod
+    def conflict(message: Optional[str] = None, **kwargs) -> "ConflictError":
+        return ConflictError(message, **kwargs)
+    
+    @staticmethod
+    def validation(message: Optional[str] = None, **kwargs) -> "ValidationError":
+        return ValidationError(message, **kwargs)
+    
+    @staticmethod
+    def database(message: Optional[str] = None, **kwargs) -> "DatabaseError":
+        return DatabaseError(message, **kwargs)
+    
+    @staticmethod
+    def external_service(message: Optional[str] = None, **kwargs) -> "ExternalServiceError":
+        return ExternalServiceError(message, **kwargs)
 
 
-class BadRequestError(ApplicationException):
-    """Exception for bad request (400) errors."""
+class PresetApplicationException(ApplicationException):
+    """Base for exceptions whose error code, status and default message are fixed per class."""
+    
+    preset_error_code: str = INTERNAL_SERVER_ERROR
+    preset_status_code: HTTPStatusCode = HTTPStatusCode.INTERNAL_SERVER_ERROR
+    preset_message: Optional[str] = None
     
     def __init__(
         self,
-        message: str,
+        message: Optional[str] = None,
         details: Optional[Dict[str, Any]] = None,
         cause: Optional[Exception] = None,
     ):
-        super().__init__(
-            error_code=ErrorCode.BAD_REQUEST,
-            message=message,
-            status_code=HTTPStatusCode.BAD_REQUEST,
-            details=details,
-            cause=cause,
+        if message is None:
+            message = self.preset_message
+            if message is None:
+                raise TypeError(f"{type(self).__name__}() missing required argument: 'message'")
+        ApplicationException.__init__(
+            self, self.preset_error_code, message, self.preset_status_code, details, cause
         )
 
 
-class UnauthorizedError(ApplicationException):
+class BadRequestError(PresetApplicationException):
+    """Exception for bad request (400) errors."""
+    
+    preset_error_code = BAD_REQUEST
+    preset_status_code = HTTPStatusCode.BAD_REQUEST
+
+
+class UnauthorizedError(PresetApplicationException):
     """Exception for unauthorized (401) errors."""
     
-    def __init__(
-        self,
-        message: str = "Unauthorized",
-        details: Optional[Dict[str, Any]] = None,
-        cause: Optional[Exception] = None,
-    ):
-        super().__init__(
-            error_code=ErrorCode.UNAUTHORIZED,
-            message=message,
-            status_code=HTTPStatusCode.UNAUTHORIZED,
-            details=details,
-            cause=cause,
-        )
+    preset_error_code = UNAUTHORIZED
+    preset_status_code = HTTPStatusCode.UNAUTHORIZED
+    preset_message = "Unauthorized"
 
 
-class ForbiddenError(ApplicationException):
+class ForbiddenError(PresetApplicationException):
     """Exception for forbidden (403) errors."""
     
-    def __init__(
-        self,
-        message: str = "Forbidden",
-        details: Optional[Dict[str, Any]] = None,
-        cause: Optional[Exception] = None,
-    ):
-        super().__init__(
-            error_code=ErrorCode.FORBIDDEN,
-            message=message,
-            status_code=HTTPStatusCode.FORBIDDEN,
-            details=details,
-            cause=cause,
-        )
+    preset_error_code = FORBIDDEN
+    preset_status_code = HTTPStatusCode.FORBIDDEN
+    preset_message = "Forbidden"
 
 
-class NotFoundError(ApplicationException):
+class NotFoundError(PresetApplicationException):
     """Exception for not found (404) errors."""
     
-    def __init__(
-        self,
-        message: str = "Resource not found",
-        details: Optional[Dict[str, Any]] = None,
-        cause: Optional[Exception] = None,
-    ):
-        super().__init__(
-            error_code=ErrorCode.NOT_FOUND,
-            message=message,
-            status_code=HTTPStatusCode.NOT_FOUND,
-            details=details,
-            cause=cause,
-        )
+    preset_error_code = NOT_FOUND
+    preset_status_code = HTTPStatusCode.NOT_FOUND
+    preset_message = "Resource not found"
 
 
-class ConflictError(ApplicationException):
+class ConflictError(PresetApplicationException):
     """Exception for conflict (409) errors."""
     
-    def __init__(
-        self,
-        message: str,
-        details: Optional[Dict[str, Any]] = None,
-        cause: Optional[Exception] = None,
-    ):
-        super().__init__(
-            error_code=ErrorCode.CONFLICT,
-            message=message,
-            status_code=HTTPStatusCode.CONFLICT,
-            details=details,
-            cause=cause,
-        )
+    preset_error_code = CONFLICT
+    preset_status_code = HTTPStatusCode.CONFLICT
 
 
-class ValidationError(ApplicationException):
+class ValidationError(PresetApplicationException):
     """Exception for validation errors."""
     
-    def __init__(
-        self,
-        message: str,
-        details: Optional[Dict[str, Any]] = None,
-        cause: Optional[Exception] = None,
-    ):
-        super().__init__(
-            error_code=ErrorCode.VALIDATION_ERROR,
-            message=message,
-            status_code=HTTPStatusCode.UNPROCESSABLE_ENTITY,
-            details=details,
-            cause=cause,
-        )
+    preset_error_code = VALIDATION_ERROR
+    preset_status_code = HTTPStatusCode.UNPROCESSABLE_ENTITY
 
 
-class DatabaseError(ApplicationException):
+class DatabaseError(PresetApplicationException):
     """Exception for database-related errors."""
     
-    def __init__(
-        self,
-        message: str,
-        details: Optional[Dict[str, Any]] = None,
-        cause: Optional[Exception] = None,
-    ):
-        super().__init__(
-            error_code=ErrorCode.DATABASE_ERROR,
-            message=message,
-            status_code=HTTPStatusCode.INTERNAL_SERVER_ERROR,
-            details=details,
-            cause=cause,
-        )
+    preset_error_code = DATABASE_ERROR
+    preset_status_code = HTTPStatusCode.INTERNAL_SERVER_ERROR
 
 
-class ExternalServiceError(ApplicationException):
+class ExternalServiceError(PresetApplicationException):
     """Exception for external service-related errors."""
     
-    def __init__(
-        self,
-        message: str,
-        details: Optional[Dict[str, Any]] = None,
-        cause: Optional[Exception] = None,
-    ):
-        super().__init__(
-            error_code=ErrorCode.EXTERNAL_SERVICE_ERROR,
-            message=message,
-            status_code=HTTPStatusCode.SERVICE_UNAVAILABLE,
-            details=details,
-            cause=cause,
-        )
+    preset_error_code = EXTERNAL_SERVICE_ERROR
+    preset_status_code = HTTPStatusCode.SERVICE_UNAVAILABLE
 
 
 class ErrorResponse:
@@ -242,7 +271,7 @@ class ErrorResponse:
     
     @staticmethod
     def format_error(
-        error_code: ErrorCode,
+        error_code: Union[ErrorCode, ErrorCodeValue],
         message: str,
         status_code: HTTPStatusCode,
         details: Optional[Dict[str, Any]] = None,
@@ -261,12 +290,25 @@ class ErrorResponse:
         Returns:
             Dictionary with standardized error response format
         """
+        return ErrorResponse._build(
+            _code_value(error_code), message, int(status_code), details, request_id
+        )
+    
+    @staticmethod
+    def _build(
+        code: str,
+        message: str,
+        status: int,
+        details: Optional[Dict[str, Any]],
+        request_id: Optional[str],
+    ) -> Dict[str, Any]:
+        """Build the response body from already-resolved code/status values."""
         response = {
             "success": False,
             "error": {
-                "code": error_code.value,
+                "code": code,
                 "message": message,
-                "status": status_code.value,
+                "status": status,
             },
         }
         
@@ -293,12 +335,12 @@ class ErrorResponse:
         Returns:
             Dictionary with standardized error response format
         """
-        return ErrorResponse.format_error(
-            error_code=exception.error_code,
-            message=exception.message,
-            status_code=exception.status_code,
-            details=exception.details if exception.details else None,
-            request_id=request_id,
+        return ErrorResponse._build(
+            exception.error_code,
+            exception.message,
+            exception._status_int,
+            exception.details,
+            request_id,
         )
     
     @staticmethod
@@ -317,7 +359,7 @@ class ErrorResponse:
             Dictionary with standardized error response format
         """
         return ErrorResponse.format_error(
-            error_code=ErrorCode.INTERNAL_SERVER_ERROR,
+            error_code=INTERNAL_SERVER_ERROR,
             message=message,
             status_code=HTTPStatusCode.INTERNAL_SERVER_ERROR,
             request_id=request_id,
@@ -348,7 +390,7 @@ class ErrorHandler:
         
         if isinstance(exception, ApplicationException):
             log_func(
-                f"Application error [{exception.error_code.value}]: {exception.message}",
+                f"Application error [{exception.error_code}]: {exception.message}",
                 extra={"request_id": request_id, "details": exception.details},
             )
             return ErrorResponse.format_exception(exception, request_id)
@@ -362,7 +404,7 @@ class ErrorHandler:
     
     @staticmethod
     def log_error(
-        error_code: ErrorCode,
+        error_code: Union[ErrorCode, ErrorCodeValue],
         message: str,
         logger_instance: Optional[logging.Logger] = None,
         **kwargs,
@@ -377,4 +419,4 @@ class ErrorHandler:
             **kwargs: Additional context information
         """
         log_func = logger_instance.error if logger_instance else logger.error
-        log_func(f"[{error_code.value}] {message}", extra=kwargs)
+        log_func(f"[{_code_value(error_code)}] {message}", extra=kwargs)
@@ -2,12 +2,47 @@
 Image Hash Utility for Duplicate Detection
 Uses perceptual hashing to detect similar images
 """
-from PIL import Image
-import imagehash
 from pathlib import Path
-from typing import Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional, Sequence
 import io
 import base64
+import logging
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+_DATA_URI_PREFIX_LEN = len('data:image')
+_HASH_SIZE = 8
+
+
+# Pillow and numpy are only needed to hash new images, not to compare stored
+# hashes, so they are loaded on first use instead of at import time.
+@lru_cache(maxsize=1)
+def _pil_image():
+    from PIL import Image
+    return Image
+
+
+@lru_cache(maxsize=1)
+def _numpy():
+    import numpy
+    return numpy
+
+
+def _fast_ahash(image: "Image.Image", hash_size: int = _HASH_SIZE) -> str:
+    """
+    Average hash, bit-for-bit identical to imagehash.average_hash (same LANCZOS
+    downscale and mean threshold), but packs the bits with np.packbits instead of
+    building an ImageHash and a '0'/'1' string to format the hex.
+    """
+    np = _numpy()
+    pixels = np.asarray(
+        image.convert('L').resize((hash_size, hash_size), _pil_image().Resampling.LANCZOS)
+    )
+    return np.packbits(pixels > pixels.mean()).tobytes().hex()
 
 
 def calculate_image_hash(image_path: str) -> str:
@@ -15,30 +50,32 @@ def calculate_image_hash(image_path: str) -> str:
     Calculate perceptual hash of an image
 
     Args:
-        image_path: Path to image file or base64 string
+        image_path: Path to image file, base64 data URI, or raw image bytes
 
     Returns:
         hex string of image hash (16 characters)
     """
+    if isinstance(image_path, (bytes, bytearray)):
+        return calculate_image_hash_from_bytes(image_path)
+
     try:
         # Handle base64 images
         if isinstance(image_path, str) and image_path.startswith('data:image'):
-            # Extract base64 data
-            header, encoded = image_path.split(',', 1)
-            image_data = base64.b64decode(encoded)
-            image = Image.open(io.BytesIO(image_data))
-        else:
-            # Handle file path
-            image = Image.open(image_path)
+            # Decode only the payload after the header; the header itself is never copied
+            comma = image_path.find(',', _DATA_URI_PREFIX_LEN)
+            if comma < 0:
+                raise ValueError("Malformed data URI: missing ',' separator")
+            return calculate_image_hash_from_bytes(base64.b64decode(image_path[comma + 1:]))
+
+        # Handle file path
+        image = _pil_image().open(image_path)
 
         # Calculate perceptual hash (average hash)
         # This detects similar images even if resized, compressed, or slightly edited
-        phash = imagehash.average_hash(image, hash_size=8)
-
-        return str(phash)
+        return _fast_ahash(image)
 
     except Exception as e:
-        print(f"Error calculating image hash: {e}")
+        logger.exception(f"Error calculating image hash: {e}")
         return None
 
 
@@ -53,11 +90,10 @@ def calculate_image_hash_from_bytes(image_bytes: bytes) -> str:
         hex string of image hash
     """
     try:
-        image = Image.open(io.BytesIO(image_bytes))
-        phash = imagehash.average_hash(image, hash_size=8)
-        return str(phash)
+        image = _pil_image().open(io.BytesIO(image_bytes))
+        return _fast_ahash(image)
     except Exception as e:
-        print(f"Error calculating image hash from bytes: {e}")
+        logger.exception(f"Error calculating image hash from bytes: {e}")
         return None
 
 
@@ -77,17 +113,17 @@ def are_images_similar(hash1: str, hash2: str, threshold: int = 5) -> bool:
     if not hash1 or not hash2:
         return False
 
-    try:
-        h1 = imagehash.hex_to_hash(hash1)
-        h2 = imagehash.hex_to_hash(hash2)
+    if hash1 == hash2:
+        return True
 
+    try:
         # Calculate Hamming distance (number of different bits)
-        distance = h1 - h2
+        distance = _hamming_distance(hash1, hash2)
 
         return distance <= threshold
 
     except Exception as e:
-        print(f"Error comparing hashes: {e}")
+        logger.warning(f"Error comparing hashes: {e}")
         return False
 
 
@@ -105,10 +141,56 @@ def get_hash_similarity_score(hash1: str, hash2: str) -> Optional[int]:
     if not hash1 or not hash2:
         return None
 
+    if hash1 == hash2:
+        return 0
+
     try:
-        h1 = imagehash.hex_to_hash(hash1)
-        h2 = imagehash.hex_to_hash(hash2)
-        return h1 - h2
+        return _hamming_distance(hash1, hash2)
     except Exception as e:
-        print(f"Error calculating similarity: {e}")
-        return None
\ No newline at end of file
+        logger.warning(f"Error calculating similarity: {e}")
+        return None
+
+
+def get_hash_similarity_scores(image_hash: str, other_hashes: Sequence[Optional[str]]) -> List[Optional[int]]:
+    """
+    Get similarity scores between one hash and many stored hashes
+
+    Args:
+        image_hash: Hash to compare
+        other_hashes: Stored hashes (None or malformed entries score None)
+
+    Returns:
+        Hamming distance per stored hash, in the same order
+    """
+    if not image_hash:
+        return [None] * len(other_hashes)
+
+    try:
+        target = _hash_to_int(image_hash)
+    except ValueError as e:
+        logger.warning(f"Error calculating similarity: {e}")
+        return [None] * len(other_hashes)
+
+    scores = []
+    for other in other_hashes:
+        if not other or len(other) != len(image_hash):
+            scores.append(None)
+            continue
+        try:
+            scores.append((target ^ _hash_to_int(other)).bit_count())
+        except ValueError:
+            scores.append(None)
+    return scores
+
+
+@lru_cache(maxsize=4096)
+def _hash_to_int(hex_hash: str) -> int:
+    """Parse a hex hash once; stored hashes are compared over and over"""
+    return int(hex_hash, 16)
+
+
+def _hamming_distance(hash1: str, hash2: str) -> int:
+    """Number of differing bits between two hex hashes of the same size"""
+    if len(hash1) != len(hash2):
+        raise ValueError(f"Hash sizes differ: {len(hash1)} vs {len(hash2)}")
+    return (_hash_to_int(hash1) ^ _hash_to_int(hash2)).bit_count()
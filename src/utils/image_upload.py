@@ -1,19 +1,30 @@
 import os
-import uuid
+import secrets
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Final, Optional, Tuple
 from fastapi import UploadFile, HTTPException, status
-import aiofiles
 
 # Configuration
 UPLOAD_DIR = Path("uploads")
-ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".heic", ".webp"}
+ALLOWED_EXTENSIONS: Final[frozenset] = frozenset({".jpg", ".jpeg", ".png", ".heic", ".webp"})
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB per read/write
+
+ALLOWED_SUBFOLDERS: Final[tuple] = ("events", "proofs", "rewards")
+# subfolder -> save directory; a single dict probe both validates and resolves it
+_SUBFOLDER_PATHS: Final[Dict[str, Path]] = {name: UPLOAD_DIR / name for name in ALLOWED_SUBFOLDERS}
 
 # Create upload directories
-(UPLOAD_DIR / "events").mkdir(parents=True, exist_ok=True)
-(UPLOAD_DIR / "proofs").mkdir(parents=True, exist_ok=True)
-(UPLOAD_DIR / "rewards").mkdir(parents=True, exist_ok=True)
+for _path in _SUBFOLDER_PATHS.values():
+    _path.mkdir(parents=True, exist_ok=True)
+
+
+@lru_cache(maxsize=1)
+def _aiofiles():
+    """Load aiofiles on the first save instead of at import time"""
+    import aiofiles
+    return aiofiles
 
 
 def validate_image_file(file: UploadFile) -> None:
@@ -36,23 +47,55 @@ def validate_image_file(file: UploadFile) -> None:
 def generate_unique_filename(original_filename: str) -> str:
     """Generate unique filename to prevent collisions"""
     file_ext = Path(original_filename).suffix.lower()
-    unique_id = uuid.uuid4().hex
-    return f"{unique_id}{file_ext}"
+    return f"{secrets.token_hex(16)}{file_ext}"
 
 
 def validate_subfolder(subfolder: str) -> None:
     """Validate subfolder to prevent directory traversal attacks"""
-    allowed_subfolders = ["events", "proofs", "rewards"]
-    if subfolder not in allowed_subfolders:
+    if subfolder not in _SUBFOLDER_PATHS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid subfolder. Allowed: {', '.join(ALLOWED_SUBFOLDERS)}"
+        )
+
+
+def resolve_upload_target(file: UploadFile, subfolder: str) -> Tuple[Path, str]:
+    """
+    Validate an upload and pick where it goes, in one pass
+
+    Same checks and error messages as validate_image_file + validate_subfolder +
+    generate_unique_filename, but the extension is parsed once and the save
+    directory comes straight out of _SUBFOLDER_PATHS.
+
+    Returns:
+        (save_path, filename)
+    """
+    if not file:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No file provided"
+        )
+
+    file_ext = Path(file.filename).suffix.lower()
+    if file_ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid file type. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+
+    save_path = _SUBFOLDER_PATHS.get(subfolder)
+    if save_path is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid subfolder. Allowed: {', '.join(allowed_subfolders)}"
+            detail=f"Invalid subfolder. Allowed: {', '.join(ALLOWED_SUBFOLDERS)}"
         )
 
+    return save_path, f"{secrets.token_hex(16)}{file_ext}"
+
 
 def validate_file_path(file_path: str) -> Path:
     """Validate and sanitize file path to prevent directory traversal"""
-    if not file_path or not file_path.startswith("/uploads/"):
+    if not file_path or not file_path.startswith("/uploads/") or "\0" in file_path:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid file path"
@@ -62,23 +105,29 @@ def validate_file_path(file_path: str) -> Path:
     relative_path = file_path.lstrip("/")
     full_path = Path(relative_path)
 
-    # Check if path is within uploads directory
+    # Cheap pre-filter: reject any '..' segment without touching the filesystem
+    if ".." in full_path.parts:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid file path - directory traversal detected"
+        )
+
+    # Authoritative check: the resolved path (symlinks followed) must stay under uploads/
     try:
         resolved_path = full_path.resolve()
         uploads_path = UPLOAD_DIR.resolve()
-
-        # Ensure the resolved path is within uploads directory
-        if not str(resolved_path).startswith(str(uploads_path)):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid file path - directory traversal detected"
-            )
-    except Exception as e:
+    except (OSError, RuntimeError):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid file path"
         )
 
+    if not resolved_path.is_relative_to(uploads_path):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid file path - directory traversal detected"
+        )
+
     return full_path
 
 
@@ -96,16 +145,8 @@ async def save_upload_file(
     Returns:
         Relative path to the saved file
     """
-    validate_image_file(file)
-    validate_subfolder(subfolder)
-
-    # Generate unique filename
-    filename = generate_unique_filename(file.filename)
-
-    # Ensure directory exists (Safety check)
-    save_path = UPLOAD_DIR / subfolder
-    save_path.mkdir(parents=True, exist_ok=True)
-
+    # Directories for every allowed subfolder are created at import time
+    save_path, filename = resolve_upload_target(file, subfolder)
     file_path = save_path / filename
 
     # Check file size while reading
@@ -113,8 +154,8 @@ async def save_upload_file(
 
     try:
         # Save file asynchronously
-        async with aiofiles.open(file_path, 'wb') as f:
-            while chunk := await file.read(8192):  # Read in 8KB chunks
+        async with _aiofiles().open(file_path, 'wb') as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
                 total_size += len(chunk)
                 if total_size > MAX_FILE_SIZE:
                     # Delete partial file
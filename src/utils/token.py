@@ -1,7 +1,15 @@
-from datetime import datetime, timedelta, timezone
+import base64
+import hashlib
+import hmac
 import os
 import logging
-from jose import jwt, JWTError
+import ssl
+import threading
+import time
+from collections import OrderedDict
+import jwt
+import orjson
+from jwt import ExpiredSignatureError, InvalidTokenError
 
 logger = logging.getLogger(__name__)
 
@@ -10,21 +18,61 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
 
+# Key bytes and the (fixed) HS256 header are encoded once; only the claims change per token
+_KEY_BYTES = SECRET_KEY.encode("utf-8")
+_HEADER_B64 = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=")
+
+
+# Verified access tokens: blake2b(token) -> (payload, valid_until).
+# The same bearer token comes in on every request, so after the first decode
+# it is served from here until the TTL (or its own exp) runs out.
+VERIFY_CACHE_SIZE = 100_000
+VERIFY_CACHE_TTL_SECONDS = 60
+_verify_cache: "OrderedDict[bytes, tuple]" = OrderedDict()
+_verify_cache_lock = threading.Lock()
+
+
+def _b64url(raw: bytes) -> bytes:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=")
+
+
+def _sign(claims: dict) -> str:
+    """Encode claims as an HS256 JWT (same output format as jwt.encode)"""
+    # orjson returns compact UTF-8 bytes directly (no separators/encode step)
+    signing_input = _HEADER_B64 + b"." + _b64url(orjson.dumps(claims))
+    signature = hmac.new(_KEY_BYTES, signing_input, hashlib.sha256).digest()
+    return (signing_input + b"." + _b64url(signature)).decode("ascii")
+
+
+def describe_hmac_backend() -> str:
+    """
+    Describe what HS256 runs on, for the startup log
+
+    hmac/hashlib hand SHA-256 to OpenSSL, which uses the SHA-NI instructions
+    when the CPU has them (OpenSSL >= 1.1.1); check for the flag on Linux.
+    """
+    try:
+        with open("/proc/cpuinfo") as f:
+            sha_ni = "yes" if " sha_ni" in f.read() else "no"
+    except OSError:
+        sha_ni = "unknown"
+    return f"{ssl.OPENSSL_VERSION}, SHA-NI: {sha_ni}"
+
 
 def create_access_token(data: dict, expires_minutes: int = ACCESS_TOKEN_EXPIRE_MINUTES):
     to_encode = data.copy()
-    now = datetime.now(timezone.utc)
-    expire = now + timedelta(minutes=expires_minutes)
-    to_encode.update({"exp": expire})
-    token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    # NumericDate straight from the clock; no datetime/timedelta objects per token
+    now = int(time.time())
+    expire = now + expires_minutes * 60
+    to_encode["exp"] = expire
+    token = _sign(to_encode)
     
-    # Debug logging
-    logger.info(f"[TOKEN] Created access_token:")
-    logger.info(f"  - User ID (sub): {data.get('sub')}")
-    logger.info(f"  - Now (UTC): {now.isoformat()}")
-    logger.info(f"  - Expires (UTC): {expire.isoformat()}")
-    logger.info(f"  - Expires in: {expires_minutes} minutes")
-    logger.info(f"  - Token prefix: {token[:50]}...")
+    # Debug logging (lazy %-formatting; nothing is built unless DEBUG is on)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "[TOKEN] Created access_token: sub=%s now=%s exp=%s (%s min) prefix=%.16s",
+            data.get("sub"), now, expire, expires_minutes, token,
+        )
     
     return token
 
@@ -35,26 +83,50 @@ def create_refresh_token(data: dict, expires_days: int = REFRESH_TOKEN_EXPIRE_DA
     Includes 'type': 'refresh' claim to distinguish from access tokens.
     """
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(days=expires_days)
-    to_encode.update({"exp": expire, "type": "refresh"})
-    token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode["exp"] = int(time.time()) + expires_days * 86400
+    to_encode["type"] = "refresh"
+    token = _sign(to_encode)
     return token
 
 
+def _verify_cache_key(token: str) -> bytes:
+    # Digest rather than the raw token, so bearer tokens are not kept in memory
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
 def verify_access_token(token: str):
+    key = _verify_cache_key(token)
+    now = time.time()
+    with _verify_cache_lock:
+        cached = _verify_cache.get(key)
+        if cached is not None:
+            payload, valid_until = cached
+            if valid_until > now:
+                _verify_cache.move_to_end(key)
+                return payload.copy()
+            del _verify_cache[key]
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        logger.info(f"[TOKEN] Verified access_token successfully:")
-        logger.info(f"  - User ID (sub): {payload.get('sub')}")
-        logger.info(f"  - Exp claim: {payload.get('exp')}")
-        return payload
-    except jwt.ExpiredSignatureError:
-        logger.warning(f"[TOKEN] Token EXPIRED! Token prefix: {token[:30]}...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[TOKEN] Verified access_token: sub=%s exp=%s", payload.get("sub"), payload.get("exp"))
+    except ExpiredSignatureError:
+        logger.warning("[TOKEN] Token EXPIRED! Token prefix: %.30s...", token)
         return None
-    except JWTError as e:
-        logger.warning(f"[TOKEN] Token verification failed: {e}. Token prefix: {token[:30]}...")
+    except InvalidTokenError as e:
+        logger.warning("[TOKEN] Token verification failed: %s. Token prefix: %.30s...", e, token)
         return None
 
+    valid_until = now + VERIFY_CACHE_TTL_SECONDS
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)) and exp < valid_until:
+        valid_until = exp
+    with _verify_cache_lock:
+        _verify_cache[key] = (payload, valid_until)
+        if len(_verify_cache) > VERIFY_CACHE_SIZE:
+            _verify_cache.popitem(last=False)
+    return payload.copy()
+
 
 def verify_refresh_token(token: str):
     """
@@ -67,5 +139,5 @@ def verify_refresh_token(token: str):
         if payload.get("type") != "refresh":
             return None
         return payload
-    except JWTError:
+    except InvalidTokenError:
         return None
\ No newline at end of file
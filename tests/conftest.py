@@ -1,19 +1,19 @@
 import sys
 import os
-import pytest
+import pytest_asyncio
 
 # Add project root to path so we can import src
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.database.db_config import engine
 
-@pytest.fixture(autouse=True)
+@pytest_asyncio.fixture(scope="session", autouse=True, loop_scope="session")
 async def cleanup_database_engine():
     """
-    Auto-use fixture to dispose of the global SQLAlchemy engine after each test.
-    This prevents 'InterfaceError: another operation is in progress' when 
-    different tests (running in different event loops) try to reuse 
-    the same async connection pool.
+    Dispose of the global SQLAlchemy engine once, after the whole session.
+    All tests and fixtures share one event loop (pytest.ini sets the session
+    loop scope), so the async connection pool stays valid across tests and
+    is not rebuilt (TCP + auth handshake) for every test.
     """
     yield
     await engine.dispose()
@@ -0,0 +1,57 @@
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.utils.constants import (
+    SortOrder,
+    UserRole,
+    ValidationConstants,
+    is_strong_password,
+    is_valid_email,
+    is_valid_phone,
+    is_valid_username,
+)
+
+
+PASSWORD_SAMPLES = [
+    "Abcdef1!",
+    "abcdef1!",
+    "ABCDEF1!",
+    "Abcdefg!",
+    "Abcdefg1",
+    "Abc1!",
+    "Abcdef1!xyz?&",
+    "Abcdef1! ",
+    "Abcdef1#",
+    "Abcdéf1!",
+    "Abcdef١!",  # Arabic-Indic digit, matched by \d
+    "",
+]
+
+
+def test_strong_password_matches_regex():
+    pattern = re.compile(ValidationConstants.PASSWORD_REGEX)
+    for sample in PASSWORD_SAMPLES:
+        expected = pattern.match(sample) is not None
+        assert is_strong_password(sample) is expected, sample
+
+
+def test_compiled_patterns():
+    assert is_valid_email("runner@ku.th")
+    assert not is_valid_email("runner@ku")
+    assert is_valid_phone("+66 (0)81-234-5678")
+    assert not is_valid_phone("12345")
+    assert is_valid_username("ku_runner-01")
+    assert not is_valid_username("ab")
+    assert not is_valid_username("ku runner")
+
+
+def test_from_value_matches_enum_call():
+    for member in UserRole:
+        assert UserRole.from_value(member.value) is UserRole(member.value)
+    with pytest.raises(ValueError):
+        SortOrder.from_value("sideways")
@@ -0,0 +1,106 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.utils.error_handler import (
+    ERROR_CODE_VALUES,
+    NOT_FOUND,
+    ApplicationException,
+    BadRequestError,
+    ErrorCode,
+    ErrorResponse,
+    HTTPStatusCode,
+    NotFoundError,
+    ValidationError,
+)
+
+
+def test_exception_to_dict():
+    exc = ValidationError("bad input", details={"field": "email"})
+    assert exc.to_dict() == {
+        "error_code": "VALIDATION_ERROR",
+        "message": "bad input",
+        "status_code": 422,
+        "details": {"field": "email"},
+    }
+
+
+def test_exception_without_details_omits_key():
+    exc = ValidationError("bad input")
+    assert exc.details is None
+    assert "details" not in exc.to_dict()
+    assert "details" not in ErrorResponse.format_exception(exc)["error"]
+
+
+def test_format_exception_matches_format_error():
+    exc = NotFoundError(details={"id": 7})
+    expected = ErrorResponse.format_error(
+        error_code=ErrorCode.NOT_FOUND,
+        message="Resource not found",
+        status_code=HTTPStatusCode.NOT_FOUND,
+        details={"id": 7},
+        request_id="req-1",
+    )
+    assert ErrorResponse.format_exception(exc, request_id="req-1") == expected
+    assert expected == {
+        "success": False,
+        "error": {
+            "code": "NOT_FOUND",
+            "message": "Resource not found",
+            "status": 404,
+            "details": {"id": 7},
+        },
+        "request_id": "req-1",
+    }
+
+
+def test_format_generic_error():
+    assert ErrorResponse.format_generic_error() == {
+        "success": False,
+        "error": {
+            "code": "INTERNAL_SERVER_ERROR",
+            "message": "An unexpected error occurred",
+            "status": 500,
+        },
+    }
+
+
+def test_status_codes_are_ints():
+    assert HTTPStatusCode.NOT_FOUND == 404
+    assert isinstance(HTTPStatusCode.NOT_FOUND, int)
+    assert ErrorCode.NOT_FOUND == "NOT_FOUND"
+    response = ErrorResponse.format_error(ErrorCode.CONFLICT, "taken", 409)
+    assert response["error"]["status"] == 409
+    assert type(response["error"]["status"]) is int
+
+
+def test_error_codes_stored_as_plain_strings():
+    enum_exc = ApplicationException(ErrorCode.NOT_FOUND, "gone", HTTPStatusCode.NOT_FOUND)
+    str_exc = ApplicationException(NOT_FOUND, "gone", HTTPStatusCode.NOT_FOUND)
+    assert type(enum_exc.error_code) is str
+    assert enum_exc.error_code == ErrorCode.NOT_FOUND
+    assert enum_exc.to_dict() == str_exc.to_dict()
+    assert ErrorResponse.format_error(NOT_FOUND, "gone", 404) == \
+        ErrorResponse.format_error(ErrorCode.NOT_FOUND, "gone", 404)
+    assert ERROR_CODE_VALUES == tuple(code.value for code in ErrorCode)
+
+
+def test_factories_return_matching_subclass():
+    exc = ApplicationException.not_found(details={"id": 1})
+    assert isinstance(exc, NotFoundError)
+    assert exc.to_dict()["message"] == "Resource not found"
+    assert exc.details == {"id": 1}
+
+    exc = ApplicationException.bad_request("nope")
+    assert isinstance(exc, BadRequestError)
+    assert exc.status_code == HTTPStatusCode.BAD_REQUEST
+    assert str(exc) == "nope"
+
+
+def test_message_required_without_preset():
+    with pytest.raises(TypeError):
+        BadRequestError()
+
@@ -2,12 +2,13 @@ import sys
 import os
 import string
 import asyncio
+from unittest.mock import AsyncMock, MagicMock
 
 # Use relative path setup for test execution if needed, or just imports
 # Assuming running from root
 sys.path.append(os.getcwd())
 
-from src.crud.event_participation_crud import generate_join_code
+from src.crud.event_participation_crud import generate_join_code, generate_join_codes, generate_unique_join_codes
 
 async def test_code_generation():
     print("Testing generate_join_code()...")
@@ -20,7 +21,7 @@ async def test_code_generation():
     assert all(c in (string.ascii_uppercase + string.digits) for c in code), "Code must be alphanumeric"
     
     # 2. Check variety/entropy (basic)
-    codes = {generate_join_code() for _ in range(1000)}
+    codes = set(generate_join_codes(1000))
     print(f"Generated 1000 codes, unique count: {len(codes)}")
     assert len(codes) == 1000, "Should generate unique codes easily in empty space"
     
@@ -31,5 +32,38 @@ async def test_code_generation():
 
     print("[OK] Test Passed: Code format is correct.")
 
+
+def test_batch_codes_cover_alphabet():
+    alphabet = string.ascii_uppercase + string.digits
+    codes = generate_join_codes(2000)
+
+    assert len(codes) == 2000
+    assert all(len(code) == 5 for code in codes)
+    # 10,000 draws: every one of the 36 characters shows up
+    assert set("".join(codes)) == set(alphabet)
+
+async def test_unique_join_codes_skip_taken():
+    # First lookup reports every candidate as taken, second reports none
+    calls = []
+
+    async def fake_execute(stmt):
+        candidates = stmt.whereclause.right.value
+        calls.append(candidates)
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = candidates if len(calls) == 1 else []
+        return result
+
+    db = AsyncMock()
+    db.execute.side_effect = fake_execute
+
+    codes = await generate_unique_join_codes(db, 50)
+
+    assert len(codes) == 50
+    assert len(set(codes)) == 50
+    assert not set(codes) & set(calls[0]), "Taken codes must not be returned"
+    assert len(calls) == 2
+
+
 if __name__ == "__main__":
     asyncio.run(test_code_generation())
+    asyncio.run(test_unique_join_codes_skip_taken())
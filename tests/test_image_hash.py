@@ -0,0 +1,71 @@
+import base64
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import imagehash
+from PIL import Image
+
+from src.utils.image_hash import (
+    _fast_ahash,
+    are_images_similar,
+    calculate_image_hash,
+    calculate_image_hash_from_bytes,
+    get_hash_similarity_score,
+    get_hash_similarity_scores,
+)
+
+
+def _half_white_png() -> bytes:
+    image = Image.new("RGB", (32, 32))
+    for x in range(16):
+        for y in range(32):
+            image.putpixel((x, y), (255, 255, 255))
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_hash_inputs_agree():
+    data = _half_white_png()
+    data_uri = "data:image/png;base64," + base64.b64encode(data).decode()
+
+    expected = calculate_image_hash_from_bytes(data)
+    assert expected == "f0f0f0f0f0f0f0f0"
+    assert calculate_image_hash(data) == expected
+    assert calculate_image_hash(data_uri) == expected
+
+
+def test_malformed_data_uri_returns_none():
+    assert calculate_image_hash("data:image/png;base64") is None
+
+
+def test_similarity_matches_imagehash():
+    pairs = [
+        ("f0f0f0f0f0f0f0f0", "f0f0f0f0f0f0f0f0"),
+        ("f0f0f0f0f0f0f0f0", "f0f0f0f0f0f0f0f1"),
+        ("ffffffffffffffff", "0000000000000000"),
+        ("8000000000000001", "0000000000000000"),
+    ]
+    for hash1, hash2 in pairs:
+        expected = imagehash.hex_to_hash(hash1) - imagehash.hex_to_hash(hash2)
+        assert get_hash_similarity_score(hash1, hash2) == expected
+        assert are_images_similar(hash1, hash2) == (expected <= 5)
+
+
+def test_batch_scores():
+    scores = get_hash_similarity_scores(
+        "f0f0f0f0f0f0f0f0",
+        ["f0f0f0f0f0f0f0f0", None, "f0f0", "zzzzzzzzzzzzzzzz", "0f0f0f0f0f0f0f0f"],
+    )
+    assert scores == [0, None, None, None, 64]
+    assert get_hash_similarity_score("f0f0", "f0f0f0f0f0f0f0f0") is None
+
+
+def test_fast_ahash_matches_imagehash():
+    image = Image.open(io.BytesIO(_half_white_png()))
+    gradient = Image.linear_gradient("L").rotate(30).convert("RGB")
+    for sample in (image, gradient, gradient.resize((37, 91))):
+        assert _fast_ahash(sample) == str(imagehash.average_hash(sample, hash_size=8))
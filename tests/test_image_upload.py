@@ -0,0 +1,49 @@
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi import HTTPException
+
+from src.utils.image_upload import resolve_upload_target, validate_file_path
+
+
+def test_valid_upload_paths():
+    assert validate_file_path("/uploads/events/abc.jpg") == Path("uploads/events/abc.jpg")
+    assert validate_file_path("/uploads/proofs/./abc.png") == Path("uploads/proofs/abc.png")
+    assert validate_file_path("/uploads/") == Path("uploads")
+
+
+@pytest.mark.parametrize("file_path", [
+    "",
+    "/etc/passwd",
+    "/uploads/../main.py",
+    "/uploads/events/../../main.py",
+    "/uploads/events/..",
+    "/uploads/events/a\0.jpg",
+    "uploads/events/abc.jpg",
+])
+def test_rejects_paths_outside_uploads(file_path):
+    with pytest.raises(HTTPException) as exc_info:
+        validate_file_path(file_path)
+    assert exc_info.value.status_code == 400
+
+
+def test_resolve_upload_target():
+    file = SimpleNamespace(filename="Photo.JPG")
+    save_path, filename = resolve_upload_target(file, "proofs")
+    assert save_path == Path("uploads/proofs")
+    assert filename.endswith(".jpg") and len(filename) == 36
+
+
+@pytest.mark.parametrize("filename, subfolder", [
+    ("photo.gif", "events"),
+    ("photo.jpg", "../secrets"),
+])
+def test_resolve_upload_target_rejects(filename, subfolder):
+    with pytest.raises(HTTPException) as exc_info:
+        resolve_upload_target(SimpleNamespace(filename=filename), subfolder)
+    assert exc_info.value.status_code == 400
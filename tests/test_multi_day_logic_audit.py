@@ -10,6 +10,8 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from sqlalchemy.engine.result import Result
 
+BANGKOK_TZ = pytz.timezone('Asia/Bangkok')
+
 # Mock models
 class MockEvent:
     def __init__(self, id=1, event_type="multi_day", event_date=None, event_end_date=None, max_checkins_per_user=10):
@@ -33,6 +35,30 @@ class MockParticipation:
         self.code_expires_at = None
         self.joined_at = datetime.now(timezone.utc)
 
+def mock_result(value):
+    """ผลลัพธ์ db.execute ที่ให้ค่าเดียวทั้ง scalar_one_or_none() และ scalar()"""
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = value
+    result.scalar.return_value = value
+    return result
+
+def dispatch_execute(registered=None, today=None, quota=0, join_code=None):
+    """
+    Fake db.execute ที่เลือกผลลัพธ์จาก SQL ของ statement แทนลำดับการเรียก
+    (โค้ดจริงสลับลำดับ/รวม query ได้โดยไม่ทำให้เทสพังเอง)
+    """
+    def dispatch(stmt, *args, **kwargs):
+        sql = str(stmt)
+        where = str(stmt.whereclause)
+        if "count(" in sql:
+            return mock_result(quota)       # Check quota
+        if "checkin_date" in where:
+            return mock_result(today)       # Check today's record
+        if "join_code" in where:
+            return mock_result(join_code)   # Join code uniqueness
+        return mock_result(registered)      # Check pre-registration
+    return dispatch
+
 # Mock DB Session
 @pytest.fixture
 def mock_db():
@@ -58,7 +84,6 @@ async def test_ensure_daily_participation_creates_new(mock_db):
     from src.models.event import EventType
     
     # Setup Data
-    BANGKOK_TZ = pytz.timezone('Asia/Bangkok')
     today = datetime.now(BANGKOK_TZ).date()
     
     # 1. Event exists and is active today
@@ -69,35 +94,12 @@ async def test_ensure_daily_participation_creates_new(mock_db):
     )
     mock_db.get.return_value = event
     
-    # 2. Mock Queries
-    # Q1: Check Pre-registration -> Returns Existing Record (User is registered)
-    # Q2: Check Today's Record -> Returns None (Needs creation)
-    # Q3: Check Quota -> Returns 0 (Limit 10)
-    
-    # We need to mock 'execute' behavior depending on call count or query structure
-    # Since checking exact SQL string is hard with mocks, we'll assume sequential calls or use side_effect
-    
-    # Let's use side_effect for execute to return different results
-    # Call 1: check_registered -> Found
-    # Call 2: existing_today -> None (So we create)
-    # Call 3: quota -> 0
-    # Call 4: get_join_code -> None (Unique)
-    
-    res_found = MagicMock()
-    res_found.scalar_one_or_none.return_value = MockParticipation()
-    
-    res_none = MagicMock()
-    res_none.scalar_one_or_none.return_value = None
-    
-    res_quota = MagicMock()
-    res_quota.scalar.return_value = 0
-    
-    mock_db.execute.side_effect = [
-        res_found, # Check pre-registered
-        res_none,  # Check today
-        res_quota, # Check quota
-        res_none,  # Check join code uniqueness (used by generate_join_code check)
-    ]
+    # 2. Mock Queries (เลือกผลจาก SQL ไม่ผูกกับลำดับการเรียก)
+    # - Pre-registration -> Found (User is registered)
+    # - Today's record   -> None (Needs creation)
+    # - Quota            -> 0 (Limit 10)
+    # - Join code check  -> None (Unique)
+    mock_db.execute.side_effect = dispatch_execute(registered=MockParticipation(), today=None, quota=0)
 
     # Run
     with patch('src.crud.event_participation_crud.generate_join_code', return_value="99999"):
@@ -124,7 +126,6 @@ async def test_ensure_daily_participation_skips_existing(mock_db):
     from src.models.event import EventType
     
     # Setup Data
-    BANGKOK_TZ = pytz.timezone('Asia/Bangkok')
     today = datetime.now(BANGKOK_TZ).date()
     
     event = MockEvent(
@@ -134,13 +135,10 @@ async def test_ensure_daily_participation_skips_existing(mock_db):
     )
     mock_db.get.return_value = event
     
-    res_found = MagicMock()
-    res_found.scalar_one_or_none.return_value = MockParticipation()
-    
-    mock_db.execute.side_effect = [
-        res_found, # Check pre-registered -> Found
-        res_found, # Check today -> Found! (Should stop here)
-    ]
+    # Pre-registered -> Found, Today -> Found! (Should stop here)
+    mock_db.execute.side_effect = dispatch_execute(
+        registered=MockParticipation(), today=MockParticipation(checkin_date=today)
+    )
     
     await ensure_daily_participation(mock_db, user_id=1, event_id=1)
     
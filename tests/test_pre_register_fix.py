@@ -2,133 +2,129 @@
 ทดสอบการแก้ไข pre_register ให้รองรับ max_checkins_per_user
 """
 import asyncio
+import logging
 import sys
 import os
 from datetime import datetime, date, timezone
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from sqlalchemy import select, func
+from sqlalchemy import text
 from src.database.db_config import SessionLocal
 from src.models.event import Event
 from src.models.event_participation import EventParticipation, ParticipationStatus
 from src.crud.event_participation_crud import pre_register_for_multi_day_event
 
+# Diagnostic output: silent under pytest unless --log-cli-level=DEBUG,
+# printed to stdout when run as a script (see __main__ below)
+logger = logging.getLogger(__name__)
+
+# ไอคอนสถานะ (ค่าคงที่ ไม่ต้องสร้าง dict ใหม่ทุกแถว)
+STATUS_ICON = {
+    ParticipationStatus.JOINED: "🟡",
+    ParticipationStatus.CHECKED_IN: "✅",
+    ParticipationStatus.COMPLETED: "🏆",
+    ParticipationStatus.EXPIRED: "⏰",
+    ParticipationStatus.CANCELLED: "❌",
+}
+
+
+# Event (as JSON), active registration count, participations (JSON, by day) and
+# whether today is already taken: four lookups fused into one statement
+PRE_REGISTER_STATUS_SQL = text("""
+    WITH e AS (
+        SELECT * FROM events WHERE id = :event_id
+    ), parts AS (
+        SELECT * FROM event_participations
+        WHERE user_id = :user_id AND event_id = :event_id
+    )
+    SELECT
+        (SELECT row_to_json(e) FROM e) AS event,
+        (SELECT count(*) FROM parts WHERE status <> :cancelled) AS registrations,
+        (SELECT json_agg(parts ORDER BY checkin_date) FROM parts) AS participations,
+        EXISTS (
+            SELECT 1 FROM parts WHERE checkin_date = :today AND status <> :cancelled
+        ) AS registered_today
+""")
+
+
+def _json_date(value):
+    """วันที่จาก row_to_json (ISO string หรือ null)"""
+    return datetime.fromisoformat(value).date() if value else None
+
 
 async def test_pre_register():
     """
     ทดสอบว่า pre_register ยอมรับให้ลงทะเบียนได้หลายครั้งตาม max_checkins_per_user
     """
-    print("="*60)
-    print("🧪 Testing Pre-Register with max_checkins_per_user")
-    print("="*60)
-    print()
+    logger.debug("🧪 Testing Pre-Register with max_checkins_per_user")
     
     user_id = 1  # เปลี่ยนเป็น user_id ของคุณ
     event_id = 5  # Event ที่มีปัญหา
     
+    # ทดสอบลงทะเบียนวันนี้
+    today = datetime.now(timezone.utc).date()
+    
     async with SessionLocal() as db:
         try:
-            # ดึงข้อมูล event
-            event_result = await db.execute(
-                select(Event).where(Event.id == event_id)
-            )
-            event = event_result.scalar_one_or_none()
+            # ดึง event, จำนวนที่ลงทะเบียน, รายการแต่ละวัน และสถานะวันนี้ ใน round-trip เดียว
+            status_result = await db.execute(PRE_REGISTER_STATUS_SQL, {
+                "event_id": event_id,
+                "user_id": user_id,
+                "today": today,
+                "cancelled": ParticipationStatus.CANCELLED.value,
+            })
+            event, current_registrations, participations, registered_today = status_result.one()
             
             if not event:
-                print(f"❌ Event ID {event_id} not found")
+                logger.debug("❌ Event ID %s not found", event_id)
                 return
             
-            print(f"📅 Event: {event.title}")
-            print(f"   Type: {event.event_type}")
-            print(f"   Max check-ins per user: {event.max_checkins_per_user}")
-            print(f"   Date: {event.event_date.date()} - {event.event_end_date.date()}")
-            print()
+            max_checkins = event['max_checkins_per_user']
             
-            # นับจำนวนที่ลงทะเบียนไปแล้ว
-            count_result = await db.execute(
-                select(func.count(EventParticipation.id))
-                .where(
-                    EventParticipation.user_id == user_id,
-                    EventParticipation.event_id == event_id,
-                    EventParticipation.status != ParticipationStatus.CANCELLED
-                )
-            )
-            current_registrations = count_result.scalar() or 0
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("📅 Event: %s", event['title'])
+                logger.debug("   Type: %s", event['event_type'])
+                logger.debug("   Max check-ins per user: %s", max_checkins)
+                logger.debug("   Date: %s - %s", _json_date(event['event_date']), _json_date(event['event_end_date']))
             
-            print(f"📊 Current Status:")
-            print(f"   Registrations: {current_registrations}/{event.max_checkins_per_user}")
-            print()
+            logger.debug("📊 Current Status:")
+            logger.debug("   Registrations: %s/%s", current_registrations, max_checkins)
             
             # ดูรายละเอียดแต่ละวัน
-            participations_result = await db.execute(
-                select(EventParticipation)
-                .where(
-                    EventParticipation.user_id == user_id,
-                    EventParticipation.event_id == event_id
-                )
-                .order_by(EventParticipation.checkin_date)
-            )
-            participations = participations_result.scalars().all()
-            
-            if participations:
-                print("📋 Existing Participations:")
+            if participations and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("📋 Existing Participations:")
                 for p in participations:
-                    status_icon = {
-                        ParticipationStatus.JOINED: "🟡",
-                        ParticipationStatus.CHECKED_IN: "✅",
-                        ParticipationStatus.COMPLETED: "🏆",
-                        ParticipationStatus.EXPIRED: "⏰",
-                        ParticipationStatus.CANCELLED: "❌"
-                    }.get(p.status, "❓")
-                    print(f"   {status_icon} {p.checkin_date}: {p.status.value} - {p.join_code}")
-                print()
-            
-            # ทดสอบลงทะเบียนวันนี้
-            today = datetime.now(timezone.utc).date()
-            
-            today_check = await db.execute(
-                select(EventParticipation)
-                .where(
-                    EventParticipation.user_id == user_id,
-                    EventParticipation.event_id == event_id,
-                    EventParticipation.checkin_date == today,
-                    EventParticipation.status != ParticipationStatus.CANCELLED
-                )
-            )
+                    status_icon = STATUS_ICON.get(p["status"], "❓")
+                    logger.debug("   %s %s: %s - %s", status_icon, p['checkin_date'], p['status'], p['join_code'])
             
-            if today_check.scalar_one_or_none():
-                print(f"⚠️ Already registered for today ({today})")
-                print(f"   Cannot register again for the same day")
-            elif event.max_checkins_per_user and current_registrations >= event.max_checkins_per_user:
-                print(f"⚠️ Already reached maximum registrations ({event.max_checkins_per_user})")
-                print(f"   Cannot register anymore")
+            if registered_today:
+                logger.debug("⚠️ Already registered for today (%s)", today)
+                logger.debug("   Cannot register again for the same day")
+            elif max_checkins and current_registrations >= max_checkins:
+                logger.debug("⚠️ Already reached maximum registrations (%s)", max_checkins)
+                logger.debug("   Cannot register anymore")
             else:
-                remaining = event.max_checkins_per_user - current_registrations if event.max_checkins_per_user else "unlimited"
-                print(f"✅ Can register today!")
-                print(f"   Remaining slots: {remaining}")
-                print()
-                print("💡 To test registration, uncomment the code below:")
-                print("   # result = await pre_register_for_multi_day_event(db, user_id, event_id)")
-                print("   # print(f'✅ Registered: {result}')")
+                remaining = max_checkins - current_registrations if max_checkins else "unlimited"
+                logger.debug("✅ Can register today!")
+                logger.debug("   Remaining slots: %s", remaining)
+                logger.debug("💡 To test registration, uncomment the code below:")
+                logger.debug("   # result = await pre_register_for_multi_day_event(db, user_id, event_id)")
+                logger.debug("   # print(f'✅ Registered: {result}')")
             
-            print()
-            print("="*60)
-            print("📝 Summary:")
-            print(f"   - Old logic: Blocked after 1st registration regardless of max_checkins")
-            print(f"   - New logic: Allows up to {event.max_checkins_per_user} registrations (1 per day)")
-            print(f"   - Current: {current_registrations} registrations")
+            logger.debug("📝 Summary:")
+            logger.debug("   - Old logic: Blocked after 1st registration regardless of max_checkins")
+            logger.debug("   - New logic: Allows up to %s registrations (1 per day)", max_checkins)
+            logger.debug("   - Current: %s registrations", current_registrations)
             
-            if event.max_checkins_per_user:
-                if current_registrations < event.max_checkins_per_user:
-                    print(f"   ✅ Still has {event.max_checkins_per_user - current_registrations} slots available")
+            if max_checkins:
+                if current_registrations < max_checkins:
+                    logger.debug("   ✅ Still has %s slots available", max_checkins - current_registrations)
                 else:
-                    print(f"   ⚠️ All slots used")
+                    logger.debug("   ⚠️ All slots used")
             
         except Exception as e:
-            print(f"❌ Error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error: %s", e)
 
 
 async def main():
@@ -136,6 +132,8 @@ async def main():
 
 
 if __name__ == "__main__":
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(logging.StreamHandler(sys.stdout))
     if sys.platform == 'win32':
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
     asyncio.run(main())
@@ -40,7 +40,9 @@ async def test_auto_expire():
 async def main():
     print("\n🚀 Starting Scheduler Tests...\n")
     
-    # Test both functions
+    # Test both functions ตามลำดับเดียวกับ production (unlock 00:00 ก่อน expire 03:00)
+    # ห้ามรันพร้อมกัน: expire เปลี่ยนแถว JOINED/CHECKED_IN ของเมื่อวานเป็น EXPIRED
+    # ซึ่ง quota ของ unlock ไม่นับ ผลของ unlock จะขึ้นกับว่าใครเสร็จก่อน
     await test_auto_unlock()
     await test_auto_expire()
     
@@ -0,0 +1,82 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jwt
+
+import src.utils.token as token_module
+
+from src.utils.token import (
+    ALGORITHM,
+    SECRET_KEY,
+    _sign,
+    create_access_token,
+    create_refresh_token,
+    verify_access_token,
+    verify_refresh_token,
+)
+
+
+def test_access_token_round_trip():
+    token = create_access_token({"sub": "42"})
+    payload = verify_access_token(token)
+    assert payload["sub"] == "42"
+    assert isinstance(payload["exp"], int)
+
+
+def test_expired_access_token_rejected():
+    token = create_access_token({"sub": "42"}, expires_minutes=-1)
+    assert verify_access_token(token) is None
+
+
+def test_tampered_access_token_rejected():
+    token = create_access_token({"sub": "42"})
+    header, payload, signature = token.split(".")
+    forged = create_access_token({"sub": "1"}).split(".")[1]
+    assert verify_access_token(f"{header}.{forged}.{signature}") is None
+    assert verify_access_token("not-a-token") is None
+
+
+def test_refresh_token_requires_refresh_type():
+    refresh = create_refresh_token({"sub": "42"})
+    assert verify_refresh_token(refresh)["sub"] == "42"
+    assert verify_refresh_token(create_access_token({"sub": "42"})) is None
+
+
+def test_signed_token_matches_pyjwt():
+    claims = {"sub": "42", "exp": 2_000_000_000}
+    assert _sign(claims) == jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def test_verified_token_cache_respects_exp(monkeypatch):
+    decode_calls = []
+    real_decode = token_module.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        decode_calls.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(token_module.jwt, "decode", counting_decode)
+
+    token = create_access_token({"sub": "7"}, expires_minutes=1)
+    first = verify_access_token(token)
+    first["sub"] = "mutated"
+    assert verify_access_token(token)["sub"] == "7"
+    assert len(decode_calls) == 1
+
+    # Past the token's own exp the cached entry must not be served
+    real_time = token_module.time.time
+    monkeypatch.setattr(token_module.time, "time", lambda: real_time() + 120)
+    verify_access_token(token)
+    assert len(decode_calls) == 2
+
+
+def test_signature_compared_as_raw_bytes():
+    token = create_access_token({"sub": "42"})
+    signing_input, _, signature = token.rpartition(".")
+    # Wrong length or not base64 at all must fail cleanly, not raise
+    assert verify_access_token(f"{signing_input}.{signature[:-4]}") is None
+    assert verify_access_token(f"{signing_input}.!!!!") is None
+    assert verify_access_token(f"{signing_input}.{signature}AAAA") is None
+